@@ -4,33 +4,206 @@ Certificate Download Portal
 """
 import os
 from flask import Flask
-from app.config import config
-from app.models import db
 
+# Database URIs whose schema has already been created in this process
+_SCHEMA_READY = set()
 
-def create_app(config_name=None):
+# Directories already known to exist in this process
+_ENSURED_DIRS = set()
+
+
+def _ensure_dir(path):
+    """Create a directory (and parents) once per process."""
+    if path in _ENSURED_DIRS:
+        return
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+    _ENSURED_DIRS.add(path)
+
+
+# Connection pragmas for SQLite; WAL lets readers run alongside a writer
+_SQLITE_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+)
+
+
+def _register_sqlite_pragmas(engine, network_mode=False):
+    """
+    Apply performance pragmas to every new SQLite connection.
+    WAL and mmap rely on shared memory, so they are skipped when the
+    database lives on a network filesystem.
+    """
+    from sqlalchemy import event
+    
+    if engine.url.get_backend_name() != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not network_mode:
+            cursor.execute('PRAGMA journal_mode=WAL')
+        for pragma in _SQLITE_PRAGMAS:
+            if network_mode and pragma.startswith('PRAGMA mmap_size'):
+                continue
+            cursor.execute(pragma)
+        cursor.close()
+
+
+# Response types worth compressing (images and PDFs are already compressed)
+_COMPRESSIBLE_MIMETYPES = {'text/html', 'text/css', 'text/plain', 'text/csv',
+                           'application/json', 'application/javascript'}
+
+
+def _compress_response(response, min_size, level):
+    """
+    Gzip a buffered text response when the client accepts it.
+    File downloads (direct passthrough) are left untouched. Every other
+    compressible response, including 304s and bodies sent uncompressed,
+    carries Vary: Accept-Encoding and a weak ETag, so caches never mix up
+    the variants and 200s and 304s share one validator.
+    """
+    from flask import request
+    
+    if response.direct_passthrough or response.mimetype not in _COMPRESSIBLE_MIMETYPES:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    
+    import gzip
+    response.set_data(gzip.compress(data, compresslevel=level))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def _x_accel_redirect(response, root, prefix):
+    """
+    Turn Flask's X-Sendfile header into nginx's X-Accel-Redirect, mapping
+    the file's path under root onto an internal location.
+    """
+    path = response.headers.get('X-Sendfile')
+    if path and path.startswith(root + os.sep):
+        del response.headers['X-Sendfile']
+        response.headers['X-Accel-Redirect'] = prefix + path[len(root) + 1:].replace(os.sep, '/')
+    return response
+
+
+def _file_wrapper_middleware(wsgi_app, buffer_size):
+    """
+    Give send_file a larger read size on servers without their own
+    wsgi.file_wrapper; Werkzeug's fallback reads 8 KB at a time.
+    """
+    from werkzeug.wsgi import FileWrapper
+    
+    def file_wrapper(file, block_size=8192):
+        return FileWrapper(file, max(block_size, buffer_size))
+    
+    def middleware(environ, start_response):
+        environ.setdefault('wsgi.file_wrapper', file_wrapper)
+        return wsgi_app(environ, start_response)
+    return middleware
+
+
+def create_app(config_name=None, config_overrides=None):
     """
     Application factory for creating Flask app instance.
     
     Args:
         config_name: Configuration name ('development', 'production', 'testing')
+        config_overrides: Optional dict applied on top of the configuration
+                          (tests use it for a temporary database and folders)
     
     Returns:
         Flask application instance
     """
+    # Imported here so importing the package stays cheap for scripts
+    from app.config import config
+    from app.models import db
+    
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if config_overrides:
+        app.config.update(config_overrides)
     
     # Ensure required directories exist
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-    os.makedirs(app.config['CERTIFICATES_FOLDER'], exist_ok=True)
-    os.makedirs(os.path.dirname(app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', '')), exist_ok=True)
+    for directory in (app.config['UPLOAD_FOLDER'], app.config['TEMPLATES_FOLDER'],
+                      app.config['CERTIFICATES_FOLDER'], app.config['GENERATED_FOLDER'],
+                      app.config['INSTANCE_DIR'],
+                      app.config.get('DATABASE_DIR')):
+        if directory:
+            _ensure_dir(directory)
+    
+    bytecode_cache_dir = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if bytecode_cache_dir:
+        from jinja2 import FileSystemBytecodeCache
+        _ensure_dir(bytecode_cache_dir)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
     
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        _register_sqlite_pragmas(db.engine, app.config.get('SQLITE_NETWORK_MODE', False))
+    
+    @app.after_request
+    def _write_pending_admin_logs(response):
+        """
+        Persist admin logs from requests that ended without a commit once
+        the response has been sent, so the INSERT never delays the client.
+        """
+        from flask import g
+        from app.models import write_admin_logs
+        rows = g.pop('_pending_admin_logs', None)
+        if rows:
+            if response.direct_passthrough:
+                # File responses bypass on_close callbacks; write now instead
+                write_admin_logs(app, rows)
+            else:
+                response.call_on_close(lambda: write_admin_logs(app, rows))
+        return response
+    
+    if app.config.get('COMPRESS_RESPONSES'):
+        min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        level = app.config.get('COMPRESS_LEVEL', 6)
+        
+        @app.after_request
+        def _gzip_response(response):
+            return _compress_response(response, min_size, level)
+    
+    accel_prefix = app.config.get('X_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        app.config['USE_X_SENDFILE'] = True
+        accel_root = os.path.abspath(app.config['X_ACCEL_REDIRECT_ROOT'])
+        accel_prefix = accel_prefix.rstrip('/') + '/'
+        
+        @app.after_request
+        def _use_x_accel_redirect(response):
+            return _x_accel_redirect(response, accel_root, accel_prefix)
+    
+    buffer_size = app.config.get('SEND_FILE_BUFFER_SIZE')
+    if buffer_size:
+        app.wsgi_app = _file_wrapper_middleware(app.wsgi_app, buffer_size)
     
     # Register blueprints
     from app.routes import auth_bp, admin_bp, public_bp
@@ -38,8 +211,17 @@ def create_app(config_name=None):
     app.register_blueprint(admin_bp)
     app.register_blueprint(public_bp)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    if app.config.get('PREWARM_RENDER_CACHES'):
+        from app.utils.certificate_generator import prewarm_render_caches
+        prewarm_render_caches()
+    
+    # Create database tables once per database (in-memory databases are
+    # fresh for every app, so they are always created)
+    db_uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if app.config.get('AUTO_CREATE_SCHEMA', True) and db_uri not in _SCHEMA_READY:
+        with app.app_context():
+            db.create_all()
+        if ':memory:' not in db_uri:
+            _SCHEMA_READY.add(db_uri)
     
     return app
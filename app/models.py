@@ -1,13 +1,53 @@
 """
 Database Models for Certificate Download Portal
 """
+import secrets
+import socket
 from datetime import datetime
+from functools import lru_cache
+from flask import current_app, g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import select, func, update, insert, event, text
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Session
+from sqlalchemy.types import TypeDecorator, String
 
 db = SQLAlchemy()
 
 
+class PackedIPAddress(TypeDecorator):
+    """
+    IP address stored in packed binary form (4 bytes for IPv4, 16 for IPv6)
+    on SQLite and returned as its usual string form. The column stays
+    VARCHAR(50): SQLite keeps the packed bytes as a BLOB in it, while values
+    that are not valid IP addresses (and legacy rows) are stored as text and
+    come back as str, so they are never mistaken for packed addresses.
+    Other databases store plain strings, so existing MySQL/PostgreSQL
+    tables need no migration.
+    """
+    impl = String(50)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != 'sqlite':
+            return value
+        family = socket.AF_INET6 if ':' in value else socket.AF_INET
+        try:
+            return socket.inet_pton(family, value)
+        except (OSError, ValueError):
+            return value
+    
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        if len(value) == 4:
+            return socket.inet_ntop(socket.AF_INET, value)
+        if len(value) == 16:
+            return socket.inet_ntop(socket.AF_INET6, value)
+        return value.decode('utf-8', errors='replace')
+
+
 class Admin(db.Model):
     """Admin user model for authentication"""
     __tablename__ = 'admins'
@@ -15,26 +55,48 @@ class Admin(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
-    is_super_admin = db.Column(db.Boolean, default=False)
+    is_super_admin = db.Column(db.Boolean, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
     
     # Relationship to admin logs
-    logs = db.relationship('AdminLog', backref='admin', lazy='dynamic',
+    logs = db.relationship('AdminLog', backref='admin', lazy='select',
                           cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set password using pbkdf2 (compatible with Python 3.7)"""
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        from werkzeug.security import generate_password_hash
+        method = current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+        self.password_hash = generate_password_hash(password, method=method)
     
     def check_password(self, password):
         """Verify password against hash"""
+        from werkzeug.security import check_password_hash
         return check_password_hash(self.password_hash, password)
     
+    @staticmethod
+    def check_dummy_password(password):
+        """
+        Hash a password for a username that doesn't exist, so failed logins
+        take as long as a real check and don't reveal valid usernames.
+        Always returns False.
+        """
+        from werkzeug.security import check_password_hash
+        method = current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+        check_password_hash(_dummy_password_hash(method), password)
+        return False
+    
     def __repr__(self):
         return f'<Admin {self.username}>'
 
 
+@lru_cache(maxsize=4)
+def _dummy_password_hash(method):
+    """Random password hash used to time-pad logins for unknown usernames."""
+    from werkzeug.security import generate_password_hash
+    return generate_password_hash(secrets.token_hex(16), method=method)
+
+
 class AdminLog(db.Model):
     """Admin activity log for tracking actions"""
     __tablename__ = 'admin_logs'
@@ -43,9 +105,13 @@ class AdminLog(db.Model):
     admin_id = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=True)
     action = db.Column(db.String(100), nullable=False)
     details = db.Column(db.Text, nullable=True)
-    ip_address = db.Column(db.String(50), nullable=True)
+    ip_address = db.Column(PackedIPAddress, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_admin_logs_admin_created', 'admin_id', 'created_at'),
+    )
+    
     def __repr__(self):
         return f'<AdminLog {self.action} at {self.created_at}>'
 
@@ -58,52 +124,97 @@ class Event(db.Model):
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=True)
     event_date = db.Column(db.Date, nullable=True)
-    is_visible = db.Column(db.Boolean, default=True)
+    is_visible = db.Column(db.Boolean, default=True, server_default=db.true())
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped on every UPDATE; public pages cache event metadata per version
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1',
+                        onupdate=text('version + 1'))
     
     # Template-based certificate generation fields
     template_filename = db.Column(db.String(500), nullable=True)  # PDF template file
     name_position_x = db.Column(db.Float, nullable=True)  # X position (percentage 0-100)
     name_position_y = db.Column(db.Float, nullable=True)  # Y position (percentage 0-100)
-    font_size = db.Column(db.Integer, default=36)  # Font size for name
-    font_color = db.Column(db.String(20), default='#000000')  # Hex color for name
-    font_name = db.Column(db.String(50), default='helv')  # Font name for certificate
+    font_size = db.Column(db.Integer, nullable=False, default=36, server_default='36')  # Font size for name
+    font_color = db.Column(db.String(20), nullable=False, default='#000000', server_default='#000000')  # Hex color for name
+    font_name = db.Column(db.String(50), nullable=False, default='helv', server_default='helv')  # Font name for certificate
     
     # Protected event fields (signed URL access only)
-    is_protected = db.Column(db.Boolean, default=False)
+    is_protected = db.Column(db.Boolean, default=False, server_default=db.false())
     access_token = db.Column(db.String(64), nullable=True)
     
     # Archived event fields
-    is_archived = db.Column(db.Boolean, default=False)
-    show_in_archive = db.Column(db.Boolean, default=False)
+    is_archived = db.Column(db.Boolean, default=False, server_default=db.false())
+    show_in_archive = db.Column(db.Boolean, default=False, server_default=db.false())
     archived_at = db.Column(db.DateTime, nullable=True)
     
     # Relationship to participants
-    participants = db.relationship('Participant', backref='event', lazy='dynamic',
+    participants = db.relationship('Participant', backref='event', lazy='select',
                                    cascade='all, delete-orphan')
     
+    # Listing pages filter on visibility/archive state and sort by creation date
+    __table_args__ = (
+        db.Index('ix_events_visible_archived_created', 'is_visible', 'is_archived', 'created_at'),
+    )
+    
     def __repr__(self):
         return f'<Event {self.name}>'
     
-    @property
+    @hybrid_property
     def has_template(self):
         """Check if event uses template-based certificates"""
         return self.template_filename is not None
     
-    @property
+    @has_template.expression
+    def has_template(cls):
+        return cls.template_filename.isnot(None)
+    
+    @hybrid_property
     def participant_count(self):
         """Get total number of participants"""
-        return self.participants.count()
+        if '_participant_count' in self.__dict__:
+            return self._participant_count
+        return db.session.query(func.count(Participant.id)).filter(
+            Participant.event_id == self.id
+        ).scalar()
     
-    @property
+    @participant_count.expression
+    def participant_count(cls):
+        return select(func.count(Participant.id)).where(
+            Participant.event_id == cls.id
+        ).scalar_subquery()
+    
+    @hybrid_property
     def total_downloads(self):
         """Get total downloads across all participants"""
-        return sum(p.download_count for p in self.participants)
+        if '_total_downloads' in self.__dict__:
+            return self._total_downloads
+        return db.session.query(
+            func.coalesce(func.sum(Participant.download_count), 0)
+        ).filter(Participant.event_id == self.id).scalar()
+    
+    @total_downloads.expression
+    def total_downloads(cls):
+        return select(func.coalesce(func.sum(Participant.download_count), 0)).where(
+            Participant.event_id == cls.id
+        ).scalar_subquery()
+    
+    @classmethod
+    def with_stats(cls, query):
+        """
+        Run an Event query that also fetches participant and download
+        totals in the same SELECT, so list views avoid one query per event.
+        """
+        events = []
+        for event, participant_count, total_downloads in query.add_columns(
+                cls.participant_count, cls.total_downloads):
+            event._participant_count = participant_count
+            event._total_downloads = total_downloads
+            events.append(event)
+        return events
     
     def generate_access_token(self):
-        """Generate a new access token for protected events"""
-        import secrets
-        self.access_token = secrets.token_hex(32)
+        """Generate a new access token for protected events (192-bit, URL-safe)"""
+        self.access_token = secrets.token_urlsafe(24)
         return self.access_token
     
     def get_signed_url(self, base_url=''):
@@ -122,11 +233,11 @@ class Participant(db.Model):
     name = db.Column(db.String(200), nullable=False)
     email = db.Column(db.String(200), nullable=False)
     certificate_filename = db.Column(db.String(500), nullable=True)  # Nullable for template-based events
-    download_count = db.Column(db.Integer, default=0)
+    download_count = db.Column(db.Integer, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship to download logs
-    download_logs = db.relationship('DownloadLog', backref='participant', lazy='dynamic',
+    download_logs = db.relationship('DownloadLog', backref='participant', lazy='select',
                                     cascade='all, delete-orphan')
     
     # Unique constraint: one certificate per email per event
@@ -137,11 +248,22 @@ class Participant(db.Model):
     def __repr__(self):
         return f'<Participant {self.email} - Event {self.event_id}>'
     
-    def increment_download(self, ip_address=None):
-        """Increment download count and log the download"""
-        self.download_count += 1
-        log = DownloadLog(participant_id=self.id, ip_address=ip_address)
-        db.session.add(log)
+    @classmethod
+    def increment_download(cls, participant_id, ip_address=None):
+        """
+        Increment download count and log the download.
+        Uses an atomic UPDATE so concurrent downloads are not lost and
+        the participant row does not need to be loaded.
+        """
+        db.session.execute(
+            update(cls)
+            .where(cls.id == participant_id)
+            .values(download_count=cls.download_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            insert(DownloadLog).values(participant_id=participant_id, ip_address=ip_address)
+        )
 
 
 class DownloadLog(db.Model):
@@ -151,19 +273,87 @@ class DownloadLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     participant_id = db.Column(db.Integer, db.ForeignKey('participants.id'), nullable=False)
     downloaded_at = db.Column(db.DateTime, default=datetime.utcnow)
-    ip_address = db.Column(db.String(50), nullable=True)
+    ip_address = db.Column(PackedIPAddress, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_download_logs_participant_downloaded', 'participant_id', 'downloaded_at'),
+        db.Index('ix_download_logs_downloaded_at', 'downloaded_at'),
+    )
     
     def __repr__(self):
         return f'<DownloadLog {self.participant_id} at {self.downloaded_at}>'
 
 
+def list_event_rows(order_by=None, **filters):
+    """
+    Fetch lightweight, read-only event rows for listing pages.
+    Returns SQLAlchemy Row objects (attribute access, no ORM instances,
+    no identity-map bookkeeping) with only the columns event cards show.
+    Cards show at most 100 characters of the description, so only 101 are
+    fetched (enough to tell whether an ellipsis is needed).
+    """
+    query = select(
+        Event.id, Event.name,
+        func.substr(Event.description, 1, 101).label('description'),
+        Event.event_date, Event.created_at
+    ).where(*(getattr(Event, key) == value for key, value in filters.items()))
+    if order_by is not None:
+        query = query.order_by(order_by)
+    return db.session.execute(query).all()
+
+
 def log_admin_action(admin_id, action, details=None, ip_address=None):
-    """Helper function to create admin log entry"""
-    log = AdminLog(
-        admin_id=admin_id,
-        action=action,
-        details=details,
-        ip_address=ip_address
-    )
-    db.session.add(log)
+    """
+    Helper function to create admin log entry.
+    Inside an app context the entry is buffered and written with the
+    next commit as a single multi-row INSERT.
+    """
+    log = {
+        'admin_id': admin_id,
+        'action': action,
+        'details': details,
+        'ip_address': ip_address,
+        # Stamped now: buffered entries may be inserted after the response
+        'created_at': datetime.utcnow()
+    }
+    if has_app_context():
+        g.setdefault('_pending_admin_logs', []).append(log)
+    else:
+        db.session.add(AdminLog(**log))
     return log
+
+
+def flush_admin_logs(session):
+    """Write buffered admin log entries using the given session."""
+    if not has_app_context():
+        return
+    rows = g.pop('_pending_admin_logs', None)
+    if rows:
+        session.execute(insert(AdminLog), rows)
+
+
+def write_admin_logs(app, rows):
+    """
+    Insert admin log entries in their own transaction. Used for entries
+    left over after the request, which may run once its context is gone.
+    """
+    with app.app_context():
+        try:
+            db.session.execute(insert(AdminLog), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception('Failed to write admin logs')
+
+
+@event.listens_for(Session, 'before_commit')
+def _flush_admin_logs_before_commit(session):
+    """Write buffered admin logs in the same transaction as the commit."""
+    flush_admin_logs(session)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_admin_logs_on_rollback(session, previous_transaction):
+    """Drop buffered admin logs along with the rest of a rolled-back request."""
+    if has_app_context():
+        g.pop('_pending_admin_logs', None)
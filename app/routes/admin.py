@@ -3,19 +3,101 @@ Admin routes for dashboard, event management, and participant management.
 All routes require admin authentication.
 """
 import os
+import time
+import uuid
 from datetime import datetime
-import pandas as pd
+from functools import lru_cache
 from flask import (Blueprint, render_template, request, redirect, url_for, 
-                   flash, current_app, session, Response, jsonify)
+                   flash, current_app, session, Response, jsonify, make_response)
+from sqlalchemy import select, func, insert
+from sqlalchemy.orm import selectinload, joinedload, load_only
 from werkzeug.utils import secure_filename
 from app.models import db, Event, Participant, DownloadLog, Admin, AdminLog, log_admin_action
 from app.routes.auth import login_required
 from app.utils.helpers import (allowed_file, allowed_bulk_file, allowed_template_file,
                                 secure_filename_custom, validate_email,
-                                generate_unique_filename)
+                                generate_unique_filename, keyset_paginate,
+                                remove_file, remove_files, save_upload, save_uploads,
+                                EMAIL_PATTERN)
+from app.utils.certificate_generator import get_available_fonts
+from app.utils.certificate_cache import clear_certificate_cache, clear_participant_certificates
+from app.utils.event_cache import forget_event_snapshot
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+# Process-local cache of dashboard totals: database URI -> (expires_at, totals)
+_dashboard_stats_cache = {}
+
+
+def get_dashboard_stats():
+    """
+    Get (total_events, total_participants, total_downloads), cached for
+    DASHBOARD_STATS_TTL seconds so repeated dashboard loads skip the counts.
+    The cache is per worker process: totals are eventually consistent, and
+    other workers may show pre-change numbers for up to the TTL.
+    """
+    key = current_app.config['SQLALCHEMY_DATABASE_URI']
+    now = time.monotonic()
+    cached = _dashboard_stats_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+    
+    # All three totals in one round trip
+    stats = tuple(db.session.query(
+        select(func.count(Event.id)).scalar_subquery(),
+        select(func.count(Participant.id)).scalar_subquery(),
+        select(func.coalesce(func.sum(Participant.download_count), 0)).scalar_subquery()
+    ).one())
+    
+    _dashboard_stats_cache[key] = (now + current_app.config.get('DASHBOARD_STATS_TTL', 30), stats)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """
+    Drop this worker's cached dashboard totals after events or participants
+    change, so the admin who made the change sees it at once. Other workers
+    catch up when their entry expires.
+    """
+    _dashboard_stats_cache.pop(current_app.config['SQLALCHEMY_DATABASE_URI'], None)
+
+
+def render_conditional(template_name, **context):
+    """
+    Render a read-only admin page with an ETag. The browser revalidates on
+    every visit and gets an empty 304 when the page has not changed.
+    """
+    response = make_response(render_template(template_name, **context))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def password_recently_verified():
+    """Whether the admin confirmed their password within PASSWORD_REVERIFY_SECONDS."""
+    window = current_app.config.get('PASSWORD_REVERIFY_SECONDS', 0)
+    return bool(window) and time.time() - session.get('password_verified_at', 0) < window
+
+
+def verify_admin_password(admin, password, allow_recent=False):
+    """
+    Confirm the current admin's password before a sensitive action.
+    Successful checks are remembered in the session; with allow_recent, a
+    blank password is accepted within PASSWORD_REVERIFY_SECONDS of the last
+    one, so chained deletions skip the password hash. A password that was
+    typed in is always checked, and privilege changes never use the window.
+    
+    Returns:
+        bool: True if verified (now or recently), False otherwise
+    """
+    if allow_recent and not password and password_recently_verified():
+        return True
+    if not admin.check_password(password):
+        session.pop('password_verified_at', None)
+        return False
+    session['password_verified_at'] = time.time()
+    return True
+
 
 @admin_bp.route('/dashboard')
 @login_required
@@ -23,24 +105,33 @@ def dashboard():
     """
     Admin dashboard with summary metrics.
     """
-    total_events = Event.query.count()
-    total_participants = Participant.query.count()
-    total_downloads = db.session.query(db.func.sum(Participant.download_count)).scalar() or 0
-    
-    # Only visible events for dashboard listing
-    visible_events = Event.query.filter_by(is_visible=True).order_by(Event.created_at.desc()).all()
+    total_events, total_participants, total_downloads = get_dashboard_stats()
+    
+    # Only visible events for dashboard listing, with just the card columns
+    visible_events = Event.with_stats(
+        Event.query.options(load_only(
+            Event.name, Event.description, Event.event_date,
+            Event.is_visible, Event.is_protected, Event.created_at
+        )).filter_by(is_visible=True).order_by(Event.created_at.desc())
+    )
     
-    # Recent downloads
-    recent_downloads = DownloadLog.query.order_by(
+    # Recent downloads, with participant and event names loaded in the same query
+    recent_downloads = DownloadLog.query.options(
+        load_only(DownloadLog.participant_id, DownloadLog.downloaded_at),
+        joinedload(DownloadLog.participant).options(
+            load_only(Participant.name, Participant.event_id),
+            joinedload(Participant.event).load_only(Event.name)
+        )
+    ).order_by(
         DownloadLog.downloaded_at.desc()
     ).limit(10).all()
     
-    return render_template('admin/dashboard.html',
-                         total_events=total_events,
-                         total_participants=total_participants,
-                         total_downloads=total_downloads,
-                         events=visible_events,
-                         recent_downloads=recent_downloads)
+    return render_conditional('admin/dashboard.html',
+                              total_events=total_events,
+                              total_participants=total_participants,
+                              total_downloads=total_downloads,
+                              events=visible_events,
+                              recent_downloads=recent_downloads)
 
 
 @admin_bp.route('/events')
@@ -66,9 +157,9 @@ def list_events():
         archived_events = archived_events.filter(search_filter)
     
     # Execute queries with ordering
-    visible_events = visible_events.order_by(Event.created_at.desc()).all()
-    hidden_events = hidden_events.order_by(Event.created_at.desc()).all()
-    archived_events = archived_events.order_by(Event.archived_at.desc()).all()
+    visible_events = Event.with_stats(visible_events.order_by(Event.created_at.desc()))
+    hidden_events = Event.with_stats(hidden_events.order_by(Event.created_at.desc()))
+    archived_events = Event.with_stats(archived_events.order_by(Event.archived_at.desc()))
     
     # Combined list in order: visible, hidden, archived
     events = visible_events + hidden_events + archived_events
@@ -90,7 +181,7 @@ def settings():
     Admin settings page.
     """
     admins = Admin.query.order_by(Admin.created_at).all()
-    return render_template('admin/settings.html', admins=admins)
+    return render_conditional('admin/settings.html', admins=admins)
 
 
 @admin_bp.route('/settings/change-password', methods=['POST'])
@@ -142,7 +233,7 @@ def new_admin():
     
     # Verify current admin's password
     password = request.form.get('admin_password', '')
-    if not current_admin.check_password(password):
+    if not verify_admin_password(current_admin, password):
         flash('Your password is incorrect.', 'error')
         return redirect(url_for('admin.settings'))
     
@@ -196,7 +287,7 @@ def delete_admin(target_admin_id):
     
     # Verify current admin's password
     password = request.form.get('admin_password', '')
-    if not current_admin.check_password(password):
+    if not verify_admin_password(current_admin, password):
         flash('Your password is incorrect.', 'error')
         return redirect(url_for('admin.settings'))
     
@@ -221,32 +312,40 @@ def delete_admin(target_admin_id):
 @login_required
 def view_logs():
     """
-    View admin activity logs.
+    View admin activity logs (newest first, keyset-paginated by id).
     """
-    page = request.args.get('page', 1, type=int)
-    per_page = 50
-    
-    admin_logs = AdminLog.query.order_by(
-        AdminLog.created_at.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
+    admin_logs = keyset_paginate(
+        AdminLog.query.options(joinedload(AdminLog.admin).load_only(Admin.username)),
+        AdminLog.id,
+        per_page=50,
+        before=request.args.get('before', type=int),
+        after=request.args.get('after', type=int)
+    )
     
-    return render_template('admin/logs.html', logs=admin_logs, log_type='admin')
+    return render_conditional('admin/logs.html', logs=admin_logs, log_type='admin')
 
 
 @admin_bp.route('/logs/downloads')
 @login_required
 def view_download_logs():
     """
-    View user download logs.
+    View user download logs (newest first, keyset-paginated by id).
     """
-    page = request.args.get('page', 1, type=int)
-    per_page = 50
-    
-    download_logs = DownloadLog.query.order_by(
-        DownloadLog.downloaded_at.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
+    download_logs = keyset_paginate(
+        DownloadLog.query.options(
+            load_only(DownloadLog.participant_id, DownloadLog.ip_address, DownloadLog.downloaded_at),
+            joinedload(DownloadLog.participant).options(
+                load_only(Participant.name, Participant.email, Participant.event_id),
+                joinedload(Participant.event).load_only(Event.name)
+            )
+        ),
+        DownloadLog.id,
+        per_page=50,
+        before=request.args.get('before', type=int),
+        after=request.args.get('after', type=int)
+    )
     
-    return render_template('admin/logs.html', logs=download_logs, log_type='downloads')
+    return render_conditional('admin/logs.html', logs=download_logs, log_type='downloads')
 
 
 # ==================== EVENT MANAGEMENT ====================
@@ -293,6 +392,7 @@ def new_event():
             ip_address=request.remote_addr
         )
         db.session.commit()
+        invalidate_dashboard_stats()
         
         flash(f'Event "{name}" created successfully!', 'success')
         return redirect(url_for('admin.event_detail', event_id=event.id))
@@ -307,8 +407,13 @@ def event_detail(event_id):
     Event detail page with all management options.
     """
     event = Event.query.get_or_404(event_id)
-    participants = event.participants.order_by(Participant.name).all()
-    return render_template('admin/event_detail.html', event=event, participants=participants)
+    participants = Participant.query.filter_by(event_id=event_id).order_by(Participant.name).all()
+    # Derive the header stats from the rows already loaded instead of
+    # running a COUNT/SUM query each time the template reads them
+    event._participant_count = len(participants)
+    event._total_downloads = sum(p.download_count or 0 for p in participants)
+    return render_conditional('admin/event_detail.html', event=event, participants=participants,
+                              password_recently_verified=password_recently_verified())
 
 
 @admin_bp.route('/events/<int:event_id>/edit', methods=['GET', 'POST'])
@@ -495,7 +600,10 @@ def delete_event(event_id):
     """
     Delete an event and all associated participants (requires password verification).
     """
-    event = Event.query.get_or_404(event_id)
+    # Load participants and their download logs up front for the delete cascade
+    event = Event.query.options(
+        selectinload(Event.participants).selectinload(Participant.download_logs)
+    ).get_or_404(event_id)
     admin_id = session.get('admin_id')
     admin = Admin.query.get_or_404(admin_id)
     
@@ -506,23 +614,17 @@ def delete_event(event_id):
     
     # Verify admin password
     password = request.form.get('admin_password', '')
-    if not admin.check_password(password):
+    if not verify_admin_password(admin, password, allow_recent=True):
         flash('Incorrect password. Event was not deleted.', 'error')
         return redirect(url_for('admin.event_detail', event_id=event_id))
     
     event_name = event.name
-    participant_count = event.participant_count
+    participant_count = len(event.participants)
     
     # Delete associated certificate files
-    for participant in event.participants:
-        if participant.certificate_filename:
-            cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
-                                     participant.certificate_filename)
-            if os.path.exists(cert_path):
-                try:
-                    os.remove(cert_path)
-                except OSError:
-                    pass  # Continue even if file deletion fails
+    certificates_folder = current_app.config['CERTIFICATES_FOLDER']
+    remove_files(os.path.join(certificates_folder, p.certificate_filename)
+                 for p in event.participants if p.certificate_filename)
     
     db.session.delete(event)
     
@@ -533,6 +635,9 @@ def delete_event(event_id):
         ip_address=request.remote_addr
     )
     db.session.commit()
+    invalidate_dashboard_stats()
+    clear_certificate_cache(event_id)
+    forget_event_snapshot(event_id)
     
     flash(f'Event "{event_name}" and all associated data deleted.', 'success')
     return redirect(url_for('admin.dashboard'))
@@ -553,9 +658,12 @@ def upload_pdfs(event_id):
         return redirect(url_for('admin.event_detail', event_id=event_id))
     
     files = request.files.getlist('pdfs')
-    uploaded_count = 0
+    uploads = []
     errors = []
     
+    certificates_folder = current_app.config['CERTIFICATES_FOLDER']
+    claimed = set()  # Names already taken by earlier files in this upload
+    
     for file in files:
         if file.filename == '':
             continue
@@ -566,19 +674,20 @@ def upload_pdfs(event_id):
         
         # Save with secure filename
         filename = secure_filename(file.filename)
-        cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], filename)
         
-        # Handle duplicate filenames
-        if os.path.exists(cert_path):
+        # Handle duplicate filenames; only the candidate name is probed, so
+        # the cost doesn't grow with the number of stored certificates
+        path = os.path.join(certificates_folder, filename)
+        if filename in claimed or os.path.exists(path):
             base, ext = os.path.splitext(filename)
-            counter = 1
-            while os.path.exists(cert_path):
-                filename = f"{base}_{counter}{ext}"
-                cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], filename)
-                counter += 1
+            filename = f"{base}_{uuid.uuid4().hex[:8]}{ext}"
+            path = os.path.join(certificates_folder, filename)
+        claimed.add(filename)
         
-        file.save(cert_path)
-        uploaded_count += 1
+        uploads.append((file, path))
+    
+    save_uploads(uploads)
+    uploaded_count = len(uploads)
     
     if uploaded_count > 0:
         log_admin_action(
@@ -657,7 +766,7 @@ def new_participant(event_id):
             # Save certificate file
             filename = generate_unique_filename(file.filename, prefix=secure_filename_custom(name))
             cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], filename)
-            file.save(cert_path)
+            save_upload(file, cert_path)
             certificate_filename = filename
         # else: pool mode - certificate_filename remains None (will use template)
         
@@ -677,6 +786,7 @@ def new_participant(event_id):
             ip_address=request.remote_addr
         )
         db.session.commit()
+        invalidate_dashboard_stats()
         
         flash(f'Participant "{name}" added successfully!', 'success')
         return redirect(url_for('admin.event_detail', event_id=event_id))
@@ -690,7 +800,7 @@ def edit_participant(participant_id):
     """
     Edit a participant's details.
     """
-    participant = Participant.query.get_or_404(participant_id)
+    participant = Participant.query.options(joinedload(Participant.event)).get_or_404(participant_id)
     event = participant.event
     
     # Block editing participants of archived events
@@ -730,16 +840,16 @@ def edit_participant(participant_id):
                 # Delete old file
                 old_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
                                        participant.certificate_filename)
-                if os.path.exists(old_path):
-                    os.remove(old_path)
+                remove_file(old_path)
                 
                 # Save new file
                 filename = generate_unique_filename(file.filename, 
                                                    prefix=secure_filename_custom(name))
                 cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], filename)
-                file.save(cert_path)
+                save_upload(file, cert_path)
                 participant.certificate_filename = filename
         
+        renamed = name != participant.name
         participant.name = name
         participant.email = email
         
@@ -750,6 +860,9 @@ def edit_participant(participant_id):
             ip_address=request.remote_addr
         )
         db.session.commit()
+        # Certificates rendered with the old name are never served again
+        if renamed:
+            clear_participant_certificates(participant.event_id, [participant.id])
         
         flash(f'Participant "{name}" updated successfully!', 'success')
         return redirect(url_for('admin.event_detail', event_id=participant.event_id))
@@ -763,7 +876,7 @@ def delete_participant(participant_id):
     """
     Delete a participant and their certificate (if custom).
     """
-    participant = Participant.query.get_or_404(participant_id)
+    participant = Participant.query.options(joinedload(Participant.event)).get_or_404(participant_id)
     event = participant.event
     event_id = participant.event_id
     name = participant.name
@@ -778,8 +891,7 @@ def delete_participant(participant_id):
     if participant.certificate_filename:
         cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
                                 participant.certificate_filename)
-        if os.path.exists(cert_path):
-            os.remove(cert_path)
+        remove_file(cert_path)
     
     db.session.delete(participant)
     
@@ -790,6 +902,8 @@ def delete_participant(participant_id):
         ip_address=request.remote_addr
     )
     db.session.commit()
+    clear_participant_certificates(event_id, [participant_id])
+    invalidate_dashboard_stats()
     
     flash(f'Participant "{name}" deleted.', 'success')
     return redirect(url_for('admin.event_detail', event_id=event_id))
@@ -815,21 +929,22 @@ def bulk_delete_participants(event_id):
         flash('No participants selected for deletion.', 'warning')
         return redirect(url_for('admin.event_detail', event_id=event_id))
     
-    deleted_count = 0
+    deleted_ids = []
+    cert_paths = []
     for pid in participant_ids:
         try:
             participant = Participant.query.get(int(pid))
             if participant and participant.event_id == event_id:
                 # Delete certificate file if custom
                 if participant.certificate_filename:
-                    cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
-                                            participant.certificate_filename)
-                    if os.path.exists(cert_path):
-                        os.remove(cert_path)
+                    cert_paths.append(os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
+                                                   participant.certificate_filename))
                 db.session.delete(participant)
-                deleted_count += 1
+                deleted_ids.append(participant.id)
         except (ValueError, TypeError):
             continue
+    remove_files(cert_paths)
+    deleted_count = len(deleted_ids)
     
     if deleted_count > 0:
         log_admin_action(
@@ -839,6 +954,8 @@ def bulk_delete_participants(event_id):
             ip_address=request.remote_addr
         )
         db.session.commit()
+        clear_participant_certificates(event_id, deleted_ids)
+        invalidate_dashboard_stats()
         flash(f'Successfully deleted {deleted_count} participant(s).', 'success')
     else:
         flash('No participants were deleted.', 'warning')
@@ -848,6 +965,86 @@ def bulk_delete_participants(event_id):
 
 # ==================== BULK UPLOAD ====================
 
+BULK_COLUMNS = ('name', 'email')
+
+
+@lru_cache(maxsize=1)
+def _excel_engine():
+    """Use the Rust-backed calamine reader when installed and supported (pandas 2.2+)."""
+    import pandas as pd
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    major, minor = (int(part) for part in pd.__version__.split('.')[:2])
+    return 'calamine' if (major, minor) >= (2, 2) else None
+
+
+def _read_bulk_file(upload_path):
+    """
+    Parse an uploaded CSV/Excel file, keeping only the name and email
+    columns as text. CSV goes through the stdlib csv module, so pandas
+    (and NumPy) is only imported for Excel files.
+    
+    Returns:
+        dict: Column name -> list of cell values, for the columns present
+    """
+    if upload_path.endswith('.csv'):
+        import csv
+        with open(upload_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            positions = {col: header.index(col) for col in BULK_COLUMNS if col in header}
+            rows = [row for row in reader if row]  # Skip blank lines
+        return {col: [row[pos] if pos < len(row) else '' for row in rows]
+                for col, pos in positions.items()}
+    
+    import pandas as pd
+    usecols = lambda column: column in BULK_COLUMNS
+    df = pd.read_excel(upload_path, usecols=usecols, dtype=str, engine=_excel_engine())
+    return {col: df[col].fillna('').tolist() for col in df.columns}
+
+
+def _validate_bulk_rows(sheet, event_id):
+    """
+    Normalise and validate bulk upload rows in a single pass, using set
+    lookups for duplicate detection.
+    
+    Returns:
+        list: Preview dicts with row, name, email, valid and errors keys
+    """
+    # Emails already registered for this event, fetched once
+    existing_emails = {email for (email,) in
+                       db.session.query(Participant.email).filter_by(event_id=event_id)}
+    seen_emails = set()
+    
+    rows = []
+    for row_number, (name, email) in enumerate(zip(sheet['name'], sheet['email']), start=1):
+        name = str(name).strip()
+        email = str(email).strip().lower()
+        errors = []
+        if not name:
+            errors.append('Missing name')
+        if not email:
+            errors.append('Missing email')
+        else:
+            if not EMAIL_PATTERN.match(email):
+                errors.append('Invalid email')
+            # Registered already, or repeated earlier in this file
+            if email in existing_emails or email in seen_emails:
+                errors.append('Duplicate email')
+            seen_emails.add(email)
+        rows.append({
+            'row': row_number,
+            'name': name,
+            'email': email,
+            'certificate_filename': '(Template)',
+            'valid': not errors,
+            'errors': ', '.join(errors) if errors else None
+        })
+    return rows
+
+
 @admin_bp.route('/events/<int:event_id>/bulk-upload', methods=['GET', 'POST'])
 @login_required
 def bulk_upload(event_id):
@@ -871,63 +1068,33 @@ def bulk_upload(event_id):
             flash('Only CSV and Excel files are allowed.', 'error')
             return render_template('admin/bulk_upload.html', event=event)
         
-        # Save file temporarily
-        filename = secure_filename(file.filename)
+        # Save file temporarily under a unique name so concurrent previews
+        # never overwrite each other's upload
+        filename = generate_unique_filename(file.filename, prefix='bulk')
         upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        file.save(upload_path)
+        save_upload(file, upload_path)
         
         try:
             # Parse file
-            if filename.endswith('.csv'):
-                df = pd.read_csv(upload_path)
-            else:
-                df = pd.read_excel(upload_path)
+            sheet = _read_bulk_file(upload_path)
             
             # Validate required columns - always just name and email
             # Bulk upload always adds to the pool (template-based)
-            required_columns = ['name', 'email']
-            
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            missing_columns = [col for col in BULK_COLUMNS if col not in sheet]
             
             if missing_columns:
-                os.remove(upload_path)
+                remove_file(upload_path)
                 flash(f'Missing required columns: {", ".join(missing_columns)}', 'error')
                 return render_template('admin/bulk_upload.html', event=event)
             
             # Validate data
-            preview_data = []
+            preview_data = _validate_bulk_rows(sheet, event_id)
             
-            for idx, row in df.iterrows():
-                name = str(row['name']).strip() if pd.notna(row['name']) else ''
-                email = str(row['email']).strip().lower() if pd.notna(row['email']) else ''
-                
-                errors = []
-                
-                if not name:
-                    errors.append('Missing name')
-                if not email:
-                    errors.append('Missing email')
-                elif not validate_email(email):
-                    errors.append('Invalid email')
-                
-                # Check for duplicate
-                existing = Participant.query.filter_by(event_id=event_id, email=email).first()
-                if existing:
-                    errors.append('Duplicate email')
-                
-                preview_data.append({
-                    'row': idx + 1,
-                    'name': name,
-                    'email': email,
-                    'certificate_filename': '(Template)',
-                    'valid': len(errors) == 0,
-                    'errors': ', '.join(errors) if errors else None
-                })
-            
-            # Store only minimal data in session (file path and event_id, NOT the preview data)
+            # Store only minimal data in session (temp filename and event_id, NOT the
+            # preview data); confirm re-parses the file from the upload folder.
             # This avoids Flask's 4KB session cookie limit
             session['bulk_upload_event_id'] = event_id
-            session['bulk_upload_file'] = upload_path
+            session['bulk_upload_file'] = filename
             
             return render_template('admin/bulk_upload_preview.html',
                                  event=event,
@@ -936,8 +1103,7 @@ def bulk_upload(event_id):
                                  invalid_count=sum(1 for d in preview_data if not d['valid']))
             
         except Exception as e:
-            if os.path.exists(upload_path):
-                os.remove(upload_path)
+            remove_file(upload_path)
             flash(f'Error parsing file: {str(e)}', 'error')
             return render_template('admin/bulk_upload.html', event=event)
     
@@ -952,12 +1118,14 @@ def bulk_upload_confirm():
     Re-parses the file to avoid session size limits.
     """
     event_id = session.get('bulk_upload_event_id')
-    upload_path = session.get('bulk_upload_file')
+    filename = session.get('bulk_upload_file')
     
-    if not event_id or not upload_path:
+    if not event_id or not filename:
         flash('No upload data found. Please try again.', 'error')
         return redirect(url_for('admin.dashboard'))
     
+    upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], os.path.basename(filename))
+    
     if not os.path.exists(upload_path):
         flash('Upload file not found. Please try again.', 'error')
         session.pop('bulk_upload_event_id', None)
@@ -967,47 +1135,29 @@ def bulk_upload_confirm():
     event = Event.query.get(event_id)
     if not event:
         flash('Event not found.', 'error')
-        if os.path.exists(upload_path):
-            os.remove(upload_path)
+        remove_file(upload_path)
         session.pop('bulk_upload_event_id', None)
         session.pop('bulk_upload_file', None)
         return redirect(url_for('admin.dashboard'))
     
     try:
         # Re-parse the file
-        filename = os.path.basename(upload_path)
-        if filename.endswith('.csv'):
-            df = pd.read_csv(upload_path)
-        else:
-            df = pd.read_excel(upload_path)
+        sheet = _read_bulk_file(upload_path)
         
-        # Import valid records only
-        imported_count = 0
-        skipped_count = 0
+        # Import valid records only, as one multi-row INSERT
+        rows = _validate_bulk_rows(sheet, event_id)
+        mappings = [{
+            'event_id': event_id,
+            'name': row['name'],
+            'email': row['email'],
+            'certificate_filename': None  # Uses template
+        } for row in rows if row['valid']]
         
-        for idx, row in df.iterrows():
-            name = str(row['name']).strip() if pd.notna(row['name']) else ''
-            email = str(row['email']).strip().lower() if pd.notna(row['email']) else ''
-            
-            # Skip invalid rows
-            if not name or not email or not validate_email(email):
-                skipped_count += 1
-                continue
-            
-            # Check for duplicate
-            existing = Participant.query.filter_by(event_id=event_id, email=email).first()
-            if existing:
-                skipped_count += 1
-                continue
-            
-            participant = Participant(
-                event_id=event_id,
-                name=name,
-                email=email,
-                certificate_filename=None  # Uses template
-            )
-            db.session.add(participant)
-            imported_count += 1
+        if mappings:
+            db.session.execute(insert(Participant), mappings)
+        
+        imported_count = len(mappings)
+        skipped_count = len(rows) - imported_count
         
         log_admin_action(
             admin_id=session.get('admin_id'),
@@ -1016,10 +1166,10 @@ def bulk_upload_confirm():
             ip_address=request.remote_addr
         )
         db.session.commit()
+        invalidate_dashboard_stats()
         
         # Cleanup
-        if os.path.exists(upload_path):
-            os.remove(upload_path)
+        remove_file(upload_path)
         
         session.pop('bulk_upload_event_id', None)
         session.pop('bulk_upload_file', None)
@@ -1029,8 +1179,7 @@ def bulk_upload_confirm():
         
     except Exception as e:
         db.session.rollback()
-        if os.path.exists(upload_path):
-            os.remove(upload_path)
+        remove_file(upload_path)
         session.pop('bulk_upload_event_id', None)
         session.pop('bulk_upload_file', None)
         flash(f'Error processing upload: {str(e)}', 'error')
@@ -1043,11 +1192,12 @@ def bulk_upload_cancel():
     """
     Cancel bulk upload and cleanup.
     """
-    upload_path = session.get('bulk_upload_file')
+    filename = session.get('bulk_upload_file')
     event_id = session.get('bulk_upload_event_id')
     
-    if upload_path and os.path.exists(upload_path):
-        os.remove(upload_path)
+    if filename:
+        upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], os.path.basename(filename))
+        remove_file(upload_path)
     
     session.pop('bulk_upload_event_id', None)
     session.pop('bulk_upload_file', None)
@@ -1068,8 +1218,6 @@ def configure_template(event_id):
     GET: Show template configuration page with upload and positioning.
     POST: Save name position and font settings.
     """
-    from app.utils.certificate_generator import get_available_fonts
-    
     event = Event.query.get_or_404(event_id)
     available_fonts = get_available_fonts()
     
@@ -1112,6 +1260,7 @@ def configure_template(event_id):
             ip_address=request.remote_addr
         )
         db.session.commit()
+        clear_certificate_cache(event_id)
         
         flash('Template configuration saved successfully!', 'success')
         return redirect(url_for('admin.event_detail', event_id=event_id))
@@ -1142,21 +1291,15 @@ def upload_template(event_id):
     
     # Delete old template if exists
     if event.template_filename:
-        old_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'templates', event.template_filename)
-        if os.path.exists(old_path):
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
+        old_path = os.path.join(current_app.config['TEMPLATES_FOLDER'], event.template_filename)
+        remove_file(old_path)
     
-    # Create templates directory if needed
-    templates_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'templates')
-    os.makedirs(templates_dir, exist_ok=True)
+    templates_dir = current_app.config['TEMPLATES_FOLDER']
     
     # Save with unique filename
     filename = generate_unique_filename(file.filename, prefix=f'template_{event.id}')
     template_path = os.path.join(templates_dir, filename)
-    file.save(template_path)
+    save_upload(file, template_path)
     
     # Update event
     event.template_filename = filename
@@ -1174,6 +1317,7 @@ def upload_template(event_id):
         ip_address=request.remote_addr
     )
     db.session.commit()
+    clear_certificate_cache(event_id)
     
     flash('Template uploaded successfully! Now configure the name position.', 'success')
     return redirect(url_for('admin.configure_template', event_id=event_id))
@@ -1190,17 +1334,17 @@ def template_preview(event_id):
     if not event.template_filename:
         return Response('No template', status=404)
     
-    template_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'templates', event.template_filename)
-    
-    if not os.path.exists(template_path):
-        return Response('Template not found', status=404)
+    template_path = os.path.join(current_app.config['TEMPLATES_FOLDER'], event.template_filename)
     
     # Serve the image directly for preview
     from flask import send_file
-    return send_file(
-        template_path,
-        mimetype='image/png'
-    )
+    try:
+        return send_file(
+            template_path,
+            mimetype='image/png'
+        )
+    except FileNotFoundError:
+        return Response('Template not found', status=404)
 
 
 @admin_bp.route('/events/<int:event_id>/delete-template', methods=['POST'])
@@ -1212,12 +1356,8 @@ def delete_template(event_id):
     event = Event.query.get_or_404(event_id)
     
     if event.template_filename:
-        template_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'templates', event.template_filename)
-        if os.path.exists(template_path):
-            try:
-                os.remove(template_path)
-            except OSError:
-                pass
+        template_path = os.path.join(current_app.config['TEMPLATES_FOLDER'], event.template_filename)
+        remove_file(template_path)
         
         event.template_filename = None
         event.name_position_x = None
@@ -1230,6 +1370,7 @@ def delete_template(event_id):
             ip_address=request.remote_addr
         )
         db.session.commit()
+        clear_certificate_cache(event_id)
         
         flash('Template deleted.', 'success')
     
@@ -4,9 +4,11 @@ Includes CAPTCHA validation for login attempts.
 """
 from functools import wraps
 from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-from app.models import Admin, AdminLog, db, log_admin_action
+from flask import (Blueprint, render_template, request, redirect, url_for, session, flash,
+                   current_app)
+from app.models import Admin, db, log_admin_action
 from app.utils.captcha import get_captcha_question, validate_captcha
+from app.utils.helpers import too_many_failures, record_failure, reset_failures
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/admin')
 
@@ -35,6 +37,13 @@ def admin_index():
     return redirect(url_for('auth.login'))
 
 
+def _login_form(error=None):
+    """Render the login form with a fresh CAPTCHA, flashing an error for retries."""
+    if error:
+        flash(error, 'error')
+    return render_template('admin/login.html', captcha_question=get_captcha_question())
+
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """
@@ -44,25 +53,36 @@ def login():
         return redirect(url_for('admin.dashboard'))
     
     if request.method == 'POST':
+        client = request.remote_addr
+        
+        # Refuse floods of failed attempts before any CAPTCHA or DB work
+        if too_many_failures('login', client):
+            return _login_form('Too many failed attempts. Please wait a minute and try again.'), 429
+        
         username = request.form.get('username', '').strip()
         password = request.form.get('password', '')
         captcha_input = request.form.get('captcha', '')
         
         # Validate CAPTCHA first (before any DB access)
         if not validate_captcha(captcha_input):
-            flash('Incorrect answer. Please solve the math problem.', 'error')
-            # Generate new CAPTCHA for retry
-            captcha_question = get_captcha_question()
-            return render_template('admin/login.html', captcha_question=captcha_question)
+            record_failure('login', client)
+            return _login_form('Incorrect answer. Please solve the math problem.')
+        
+        # Validate credentials; unknown usernames still pay for a hash check
+        admin = Admin.query.filter_by(username=username).first() if username else None
         
-        # Validate credentials
-        admin = Admin.query.filter_by(username=username).first()
+        if admin:
+            password_ok = admin.check_password(password)
+        else:
+            password_ok = Admin.check_dummy_password(password)
         
-        if admin and admin.check_password(password):
+        if password_ok:
             session['admin_logged_in'] = True
             session['admin_username'] = admin.username
             session['admin_id'] = admin.id
             session['is_super_admin'] = admin.is_super_admin
+            session.pop('password_verified_at', None)
+            reset_failures('login', client)
             
             # Update last login
             admin.last_login = datetime.utcnow()
@@ -79,22 +99,27 @@ def login():
             flash('Login successful!', 'success')
             return redirect(url_for('admin.dashboard'))
         else:
-            # Log failed attempt
-            log_admin_action(
-                admin_id=None,
-                action='login_failed',
-                details=f'Failed login attempt for username: {username}',
-                ip_address=request.remote_addr
-            )
-            db.session.commit()
-            flash('Invalid username or password.', 'error')
-            # Generate new CAPTCHA for retry
-            captcha_question = get_captcha_question()
-            return render_template('admin/login.html', captcha_question=captcha_question)
+            failures = record_failure('login', client)
+            
+            # Audit the first failure from an address in each window and the
+            # one that triggers the lockout, so login floods can't turn into
+            # one INSERT per attempt
+            limit = current_app.config.get('FAILED_ATTEMPT_LIMIT', 0)
+            if failures == 1 or failures == limit:
+                details = f'Failed login attempt for username: {username}'
+                if failures > 1:
+                    details += f' ({failures} failed attempts from this address; further attempts refused)'
+                # Written after the response is sent
+                log_admin_action(
+                    admin_id=None,
+                    action='login_failed',
+                    details=details,
+                    ip_address=client
+                )
+            return _login_form('Invalid username or password.')
     
     # GET request - generate new CAPTCHA
-    captcha_question = get_captcha_question()
-    return render_template('admin/login.html', captcha_question=captcha_question)
+    return _login_form()
 
 
 @auth_bp.route('/logout')
@@ -111,12 +136,12 @@ def logout():
             action='logout',
             details=f'Admin {username} logged out',
             ip_address=request.remote_addr
-        )
-        db.session.commit()
+        )  # Written after the response is sent
     
     session.pop('admin_logged_in', None)
     session.pop('admin_username', None)
     session.pop('admin_id', None)
     session.pop('is_super_admin', None)
+    session.pop('password_verified_at', None)
     flash('You have been logged out.', 'info')
     return redirect(url_for('auth.login'))
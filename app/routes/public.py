@@ -3,16 +3,83 @@ Public routes for landing page and certificate download.
 Includes CAPTCHA validation for download requests.
 """
 import os
-import io
+import hmac
 from flask import (Blueprint, render_template, request, redirect, url_for, 
                    flash, current_app, send_file, session, Response, abort)
-from app.models import db, Event, Participant
+from sqlalchemy.orm import load_only
+from app.models import db, Event, Participant, list_event_rows
 from app.utils.captcha import get_captcha_question, validate_captcha
-from app.utils.helpers import validate_email, sanitize_email
-from app.utils.certificate_generator import generate_certificate_png
+from app.utils.helpers import (validate_email, sanitize_email, too_many_failures,
+                               record_failure, reset_failures)
+from app.utils.certificate_cache import get_certificate_path, certificate_digest
+from app.utils.event_cache import get_event_snapshot
 
 public_bp = Blueprint('public', __name__)
 
+# CSS font stacks for client-side certificate rendering
+_CSS_FONTS = {
+    'arial': 'Arial, sans-serif',
+    'arial_bold': 'Arial, sans-serif',
+    'times': '"Times New Roman", serif',
+    'times_bold': '"Times New Roman", serif',
+    'georgia': 'Georgia, serif',
+    'verdana': 'Verdana, sans-serif',
+    'tahoma': 'Tahoma, sans-serif',
+    'courier': '"Courier New", monospace',
+    'trebuchet': '"Trebuchet MS", sans-serif',
+    'palatino': '"Palatino Linotype", serif',
+    'garamond': 'Garamond, serif',
+    'bookman': '"Bookman Old Style", serif',
+    'century': '"Century Gothic", sans-serif',
+    'lucida': '"Lucida Console", monospace',
+}
+
+# Characters replaced with '_' when building download filenames
+_FILENAME_TRANS = str.maketrans({c: '_' for c in ' /\\:*?"<>|'})
+
+
+def _get_participant_and_event(participant_id):
+    """
+    Load the participant columns the certificate routes use, plus the
+    cached event snapshot, or abort with 404.
+    """
+    participant = db.session.get(Participant, participant_id, options=[
+        load_only(Participant.name, Participant.certificate_filename, Participant.event_id)
+    ])
+    if participant is None:
+        abort(404)
+    event = get_event_snapshot(participant.event_id)
+    if event is None:
+        abort(404)
+    return participant, event
+
+
+def _private_cache(response, etag=None):
+    """
+    Let the browser keep a private copy but revalidate it on every use,
+    so repeat views cost a 304 instead of the full image.
+    """
+    if etag:
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _custom_certificate_path(filename):
+    """Absolute path of an uploaded (custom) certificate file."""
+    return os.path.join(current_app.config['CERTIFICATES_FOLDER'], filename)
+
+
+def _send_file_if_exists(path, **kwargs):
+    """
+    Serve a file, or return None if it is missing. Lets send_file's own
+    stat/open detect a missing file instead of a separate exists() check.
+    """
+    try:
+        return send_file(path, **kwargs)
+    except FileNotFoundError:
+        return None
+
 
 @public_bp.route('/')
 def index():
@@ -21,21 +88,31 @@ def index():
     Protected events are excluded. Archived events shown separately.
     """
     # Get only visible, non-protected, non-archived events for main display
-    events = Event.query.filter_by(
+    events = list_event_rows(
         is_visible=True, 
         is_protected=False,
-        is_archived=False
-    ).order_by(Event.created_at.desc()).all()
+        is_archived=False,
+        order_by=Event.created_at.desc()
+    )
     
     # Get archived events that should be shown on homepage
-    archived_events = Event.query.filter_by(
+    archived_events = list_event_rows(
         is_archived=True,
-        show_in_archive=True
-    ).order_by(Event.archived_at.desc()).all()
+        show_in_archive=True,
+        order_by=Event.archived_at.desc()
+    )
     
     return render_template('public/index.html', events=events, archived_events=archived_events)
 
 
+def _download_form(event, error=None):
+    """Render the download form with a fresh CAPTCHA, flashing an error for retries."""
+    if error:
+        flash(error, 'error')
+    return render_template('public/download.html', event=event,
+                           captcha_question=get_captcha_question())
+
+
 @public_bp.route('/event/<int:event_id>', methods=['GET', 'POST'])
 def download_page(event_id):
     """
@@ -43,7 +120,9 @@ def download_page(event_id):
     Protected events require valid access token.
     Archived events with show_in_archive show a message that downloads are disabled.
     """
-    event = Event.query.get_or_404(event_id)
+    event = get_event_snapshot(event_id)
+    if event is None:
+        abort(404)
     
     # Archived events with show_in_archive can be viewed but not downloaded
     if event.is_archived:
@@ -61,67 +140,63 @@ def download_page(event_id):
     # Check if protected event - require valid token
     if event.is_protected:
         token = request.args.get('token', '')
-        if not token or token != event.access_token:
+        if not token or not hmac.compare_digest(token.encode(), (event.access_token or '').encode()):
             abort(404)  # Don't reveal that the event exists
     
     if request.method == 'POST':
+        client = request.remote_addr
+        
+        # Refuse floods of failed attempts before any CAPTCHA or DB work
+        if too_many_failures('download', client):
+            return _download_form(event, 'Too many failed attempts. Please wait a minute and try again.'), 429
+        
         email = request.form.get('email', '').strip()
         captcha_input = request.form.get('captcha', '')
         
         # Validate CAPTCHA first (before any DB access)
         if not validate_captcha(captcha_input):
-            flash('Incorrect answer. Please solve the math problem.', 'error')
-            # Generate new CAPTCHA for retry
-            captcha_question = get_captcha_question()
-            return render_template('public/download.html', event=event, captcha_question=captcha_question)
+            record_failure('download', client)
+            return _download_form(event, 'Incorrect answer. Please solve the math problem.')
         
         # Validate email
         if not email:
-            flash('Please enter your email address.', 'error')
-            captcha_question = get_captcha_question()
-            return render_template('public/download.html', event=event, captcha_question=captcha_question)
+            return _download_form(event, 'Please enter your email address.')
         
         if not validate_email(email):
-            flash('Please enter a valid email address.', 'error')
-            captcha_question = get_captcha_question()
-            return render_template('public/download.html', event=event, captcha_question=captcha_question)
+            return _download_form(event, 'Please enter a valid email address.')
         
         # Sanitize email
         email = sanitize_email(email)
         
         # Find participant
-        participant = Participant.query.filter_by(
+        participant = Participant.query.options(
+            load_only(Participant.certificate_filename)
+        ).filter_by(
             event_id=event_id, 
             email=email
         ).first()
         
         if not participant:
-            flash('No certificate found for this email address. Please check your email and try again.', 'error')
-            captcha_question = get_captcha_question()
-            return render_template('public/download.html', event=event, captcha_question=captcha_question)
+            # Not counted: shared campus addresses would lock out on typos
+            return _download_form(event, 'No certificate found for this email address. Please check your email and try again.')
         
         # For template-based participants (no certificate_filename), skip file check
         # Certificate will be generated dynamically on download
         if participant.certificate_filename:
             # Verify certificate file exists (only for custom certificates)
-            cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
-                                    participant.certificate_filename)
+            cert_path = _custom_certificate_path(participant.certificate_filename)
             if not os.path.exists(cert_path):
-                flash('Certificate file not found. Please contact the administrator.', 'error')
-                captcha_question = get_captcha_question()
-                return render_template('public/download.html', event=event, captcha_question=captcha_question)
+                return _download_form(event, 'Certificate file not found. Please contact the administrator.')
         elif not event.has_template:
             # No certificate file and no template - something is wrong
-            flash('Certificate not available. Please contact the administrator.', 'error')
-            captcha_question = get_captcha_question()
-            return render_template('public/download.html', event=event, captcha_question=captcha_question)
+            return _download_form(event, 'Certificate not available. Please contact the administrator.')
         
         # Redirect to certificate view page
+        reset_failures('download', client)
         return redirect(url_for('public.view_certificate', participant_id=participant.id))
     
     # GET request - generate new CAPTCHA
-    captcha_question = get_captcha_question()
-    return render_template('public/download.html', event=event, captcha_question=captcha_question)
+    return _download_form(event)
 
 
 @public_bp.route('/certificate/<int:participant_id>')
@@ -129,8 +204,7 @@ def view_certificate(participant_id):
     """
     Separate page to view certificate with preview and download option.
     """
-    participant = Participant.query.get_or_404(participant_id)
-    event = participant.event
+    participant, event = _get_participant_and_event(participant_id)
     
     # Verify event is still visible
     if not event.is_visible:
@@ -140,8 +214,7 @@ def view_certificate(participant_id):
     # Verify certificate availability
     if participant.certificate_filename:
         # Custom certificate - check file exists
-        cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
-                                participant.certificate_filename)
+        cert_path = _custom_certificate_path(participant.certificate_filename)
         if not os.path.exists(cert_path):
             flash('Certificate file not found.', 'error')
             return redirect(url_for('public.index'))
@@ -163,8 +236,7 @@ def preview_certificate(participant_id):
     """
     import logging
     
-    participant = Participant.query.get_or_404(participant_id)
-    event = participant.event
+    participant, event = _get_participant_and_event(participant_id)
     
     logging.info(f"Preview certificate for participant {participant_id}: {participant.name}")
     logging.info(f"Event: {event.name}, has_template: {event.has_template}, template_filename: {event.template_filename}")
@@ -177,68 +249,40 @@ def preview_certificate(participant_id):
     
     # Check if this is a template-based participant
     if event.has_template and not participant.certificate_filename:
-        # Generate certificate dynamically from template
-        template_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'templates', event.template_filename)
-        
-        logging.info(f"Template path: {template_path}")
-        logging.info(f"Template exists: {os.path.exists(template_path)}")
-        
-        if not os.path.exists(template_path):
-            logging.error(f"Template file not found: {template_path}")
-            flash('Certificate template not found.', 'error')
-            return redirect(url_for('public.index'))
-        
+        # Generate certificate dynamically from template (cached on disk)
         if event.name_position_x is None or event.name_position_y is None:
             logging.error(f"Template not configured: x={event.name_position_x}, y={event.name_position_y}")
             flash('Certificate template not properly configured.', 'error')
             return redirect(url_for('public.index'))
         
-        logging.info(f"Generating certificate with: x={event.name_position_x}, y={event.name_position_y}, font={event.font_name}")
+        # The ETag is known before rendering, so a repeat preview is a 304
+        # without touching the template or the cache directory
+        etag = f'{participant.id}-{certificate_digest(event, participant.name)}'
+        if etag in request.if_none_match:
+            return _private_cache(Response(status=304), etag)
         
-        cert_bytes = generate_certificate_png(
-            template_path=template_path,
-            participant_name=participant.name,
-            x_percent=event.name_position_x,
-            y_percent=event.name_position_y,
-            font_size=event.font_size or 36,
-            font_color=event.font_color or '#000000',
-            font_name=event.font_name or 'helv'
-        )
+        cert_path = get_certificate_path(event, participant.id, participant.name)
         
-        if cert_bytes is None:
+        if cert_path is None:
             logging.error("Certificate generation returned None!")
             flash('Could not generate certificate.', 'error')
             return redirect(url_for('public.index'))
         
-        logging.info(f"Certificate generated successfully, size: {len(cert_bytes)} bytes")
-        
-        # Use Response instead of send_file for Passenger WSGI compatibility
-        response = Response(
-            cert_bytes,
-            mimetype='image/png'
-        )
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-        return response
+        return _private_cache(send_file(cert_path, mimetype='image/png', etag=False), etag)
     else:
         # Custom certificate - serve from file
         if not participant.certificate_filename:
             flash('Certificate not available.', 'error')
             return redirect(url_for('public.index'))
         
-        cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
-                                participant.certificate_filename)
+        cert_path = _custom_certificate_path(participant.certificate_filename)
         
-        if not os.path.exists(cert_path):
+        # Serve file inline for preview
+        response = _send_file_if_exists(cert_path, mimetype='image/png')
+        if response is None:
             flash('Certificate file not found.', 'error')
             return redirect(url_for('public.index'))
-        
-        # Serve file inline for preview
-        return send_file(
-            cert_path,
-            mimetype='image/png'
-        )
+        return _private_cache(response)
 
 
 @public_bp.route('/download/<int:participant_id>')
@@ -248,8 +292,7 @@ def download_certificate(participant_id):
     Tracks download count.
     Supports both template-based (dynamic generation) and pre-uploaded certificates.
     """
-    participant = Participant.query.get_or_404(participant_id)
-    event = participant.event
+    participant, event = _get_participant_and_event(participant_id)
     
     # Verify event is still visible
     if not event.is_visible:
@@ -257,50 +300,35 @@ def download_certificate(participant_id):
         return redirect(url_for('public.index'))
     
     # Create download filename: name_of_student_name_of_event.png
-    student_name = participant.name.replace(' ', '_').replace('/', '_').replace('\\', '_')
-    event_name = event.name.replace(' ', '_').replace('/', '_').replace('\\', '_')
+    student_name = participant.name.translate(_FILENAME_TRANS)
+    event_name = event.name.translate(_FILENAME_TRANS)
     download_filename = f"{student_name}_{event_name}.png"
     
     # Check if this is a template-based event (no individual certificate file)
     if event.has_template and not participant.certificate_filename:
-        # Generate certificate dynamically from template
-        template_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'templates', event.template_filename)
-        
-        if not os.path.exists(template_path):
-            flash('Certificate template not found.', 'error')
-            return redirect(url_for('public.index'))
-        
         # Verify template configuration is complete
         if event.name_position_x is None or event.name_position_y is None:
             flash('Certificate template not properly configured.', 'error')
             return redirect(url_for('public.index'))
         
-        # Generate the certificate with participant's name
-        cert_bytes = generate_certificate_png(
-            template_path=template_path,
-            participant_name=participant.name,
-            x_percent=event.name_position_x,
-            y_percent=event.name_position_y,
-            font_size=event.font_size or 36,
-            font_color=event.font_color or '#000000',
-            font_name=event.font_name or 'helv'
-        )
+        # Generate the certificate with participant's name (cached on disk)
+        cert_path = get_certificate_path(event, participant.id, participant.name)
         
-        if cert_bytes is None:
+        if cert_path is None:
             flash('Could not generate certificate.', 'error')
             return redirect(url_for('public.index'))
         
         # Track download
         ip_address = request.remote_addr
-        participant.increment_download(ip_address=ip_address)
+        Participant.increment_download(participant.id, ip_address=ip_address)
         db.session.commit()
         
-        # Use Response instead of send_file for Passenger WSGI compatibility
-        response = Response(
-            cert_bytes,
+        response = send_file(
+            cert_path,
+            as_attachment=True,
+            download_name=download_filename,
             mimetype='image/png'
         )
-        response.headers['Content-Disposition'] = f'attachment; filename="{download_filename}"'
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '0'
@@ -311,25 +339,25 @@ def download_certificate(participant_id):
             flash('Certificate file not found.', 'error')
             return redirect(url_for('public.index'))
         
-        cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], 
-                                participant.certificate_filename)
+        cert_path = _custom_certificate_path(participant.certificate_filename)
         
-        if not os.path.exists(cert_path):
+        # Serve the file as download
+        response = _send_file_if_exists(
+            cert_path,
+            as_attachment=True,
+            download_name=download_filename,
+            mimetype='image/png'
+        )
+        if response is None:
             flash('Certificate file not found.', 'error')
             return redirect(url_for('public.index'))
         
         # Track download
         ip_address = request.remote_addr
-        participant.increment_download(ip_address=ip_address)
+        Participant.increment_download(participant.id, ip_address=ip_address)
         db.session.commit()
         
-        # Serve the file as download
-        return send_file(
-            cert_path,
-            as_attachment=True,
-            download_name=download_filename,
-            mimetype='image/png'
-        )
+        return response
 
 
 # ==================== API ENDPOINTS ====================
@@ -342,31 +370,12 @@ def get_certificate_data(participant_id):
     """
     from flask import jsonify
     
-    participant = Participant.query.get_or_404(participant_id)
-    event = participant.event
+    participant, event = _get_participant_and_event(participant_id)
     
     # Verify event is visible
     if not event.is_visible:
         return jsonify({'error': 'Event not available'}), 404
     
-    # Font mapping for CSS
-    font_map = {
-        'arial': 'Arial, sans-serif',
-        'arial_bold': 'Arial, sans-serif',
-        'times': '"Times New Roman", serif',
-        'times_bold': '"Times New Roman", serif',
-        'georgia': 'Georgia, serif',
-        'verdana': 'Verdana, sans-serif',
-        'tahoma': 'Tahoma, sans-serif',
-        'courier': '"Courier New", monospace',
-        'trebuchet': '"Trebuchet MS", sans-serif',
-        'palatino': '"Palatino Linotype", serif',
-        'garamond': 'Garamond, serif',
-        'bookman': '"Bookman Old Style", serif',
-        'century': '"Century Gothic", sans-serif',
-        'lucida': '"Lucida Console", monospace',
-    }
-    
     # Check if custom certificate or template-based
     if participant.certificate_filename:
         # Custom certificate - serve via route
@@ -390,7 +399,7 @@ def get_certificate_data(participant_id):
             'y_percent': event.name_position_y or 35,
             'font_size': event.font_size or 36,
             'font_color': event.font_color or '#000000',
-            'font_family': font_map.get(font_name, 'Arial, sans-serif'),
+            'font_family': _CSS_FONTS.get(font_name, 'Arial, sans-serif'),
             'font_weight': font_weight
         })
     else:
@@ -400,28 +409,30 @@ def get_certificate_data(participant_id):
 @public_bp.route('/template/<int:event_id>')
 def serve_template(event_id):
     """Serve template image for client-side rendering."""
-    event = Event.query.get_or_404(event_id)
+    event = get_event_snapshot(event_id)
+    if event is None:
+        abort(404)
     
     if not event.is_visible or not event.template_filename:
         return '', 404
     
-    template_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'templates', event.template_filename)
+    template_path = os.path.join(current_app.config['TEMPLATES_FOLDER'], event.template_filename)
     
-    if not os.path.exists(template_path):
+    response = _send_file_if_exists(template_path, mimetype='image/png')
+    if response is None:
         return '', 404
-    
-    return send_file(template_path, mimetype='image/png')
+    return _private_cache(response)
 
 
 @public_bp.route('/certificate-file/<filename>')
 def serve_certificate_file(filename):
     """Serve custom certificate file."""
-    cert_path = os.path.join(current_app.config['CERTIFICATES_FOLDER'], filename)
+    cert_path = _custom_certificate_path(filename)
     
-    if not os.path.exists(cert_path):
+    response = _send_file_if_exists(cert_path, mimetype='image/png')
+    if response is None:
         return '', 404
-    
-    return send_file(cert_path, mimetype='image/png')
+    return _private_cache(response)
 
 
 # ==================== ERROR HANDLERS ====================
@@ -0,0 +1,122 @@
+"""
+On-disk cache for template-generated certificates.
+Files are named after a hash of every rendering input, so changing the
+template, its layout or the participant's name produces a new file and
+stale ones are simply never served again.
+"""
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+from flask import current_app
+from app.utils.certificate_generator import generate_certificate_png
+
+# Per-file render locks for certificates currently being generated
+_render_locks = {}
+_render_locks_guard = threading.Lock()
+
+
+def _render_options(event):
+    """Rendering settings for an event, with the same defaults the routes use."""
+    return (
+        event.name_position_x,
+        event.name_position_y,
+        event.font_size or 36,
+        event.font_color or '#000000',
+        event.font_name or 'helv',
+    )
+
+
+def _event_cache_dir(event_id):
+    return os.path.join(current_app.config['GENERATED_FOLDER'], str(event_id))
+
+
+def certificate_digest(event, participant_name):
+    """
+    Short hash of every input that affects a generated certificate.
+    Also usable as an HTTP validator, since it changes whenever the output would.
+    """
+    key = '|'.join(str(part) for part in
+                   (event.template_filename, participant_name) + _render_options(event))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def get_certificate_path(event, participant_id, participant_name):
+    """
+    Get the path of a participant's generated certificate, rendering and
+    storing it on the first request.
+
+    Args:
+        event: Event (or event snapshot) with a configured template
+        participant_id: Participant primary key
+        participant_name: Name to draw on the certificate
+
+    Returns:
+        str: Path to the PNG file, or None if generation failed
+    """
+    digest = certificate_digest(event, participant_name)
+    cache_dir = _event_cache_dir(event.id)
+    cert_path = os.path.join(cache_dir, f'{participant_id}_{digest}.png')
+    if os.path.isfile(cert_path):
+        return cert_path
+
+    # Single-flight: a preview and download racing for the same certificate
+    # render it once; the second caller waits and finds the file
+    with _render_locks_guard:
+        lock = _render_locks.setdefault(cert_path, threading.Lock())
+    try:
+        with lock:
+            if os.path.isfile(cert_path):
+                return cert_path
+            return _render_to_cache(event, participant_name, cache_dir, cert_path)
+    finally:
+        with _render_locks_guard:
+            if _render_locks.get(cert_path) is lock and not lock.locked():
+                del _render_locks[cert_path]
+
+
+def _render_to_cache(event, participant_name, cache_dir, cert_path):
+    """Render a certificate and atomically store it at cert_path."""
+    x_percent, y_percent, font_size, font_color, font_name = _render_options(event)
+    cert_bytes = generate_certificate_png(
+        template_path=os.path.join(current_app.config['TEMPLATES_FOLDER'], event.template_filename),
+        participant_name=participant_name,
+        x_percent=x_percent,
+        y_percent=y_percent,
+        font_size=font_size,
+        font_color=font_color,
+        font_name=font_name
+    )
+    if cert_bytes is None:
+        return None
+
+    # Write to a temp file and rename so concurrent requests never see a partial PNG
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.tmp', delete=False) as f:
+        f.write(cert_bytes)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, cert_path)
+    return cert_path
+
+
+def clear_certificate_cache(event_id):
+    """Remove all generated certificates for an event."""
+    shutil.rmtree(_event_cache_dir(event_id), ignore_errors=True)
+
+
+def clear_participant_certificates(event_id, participant_ids):
+    """Remove generated certificates for some of an event's participants."""
+    prefixes = tuple(f'{participant_id}_' for participant_id in participant_ids)
+    if not prefixes:
+        return
+    try:
+        entries = list(os.scandir(_event_cache_dir(event_id)))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.name.startswith(prefixes):
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
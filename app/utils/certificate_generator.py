@@ -7,6 +7,8 @@ Compatible with cPanel shared hosting (pure Python).
 import os
 import io
 import logging
+import traceback
+from functools import lru_cache
 
 try:
     from PIL import Image, ImageDraw, ImageFont
@@ -32,30 +34,41 @@ AVAILABLE_FONTS = {
     'courier': ('Courier New', ['DejaVuSansMono.ttf', 'cour.ttf', 'Courier New.ttf']),
 }
 
+# Font every certificate name is drawn in (see generate_certificate_png)
+NAME_FONT = 'times'
+NAME_FONT_SIZE = 70
+
+
 def get_available_fonts():
     """Return dictionary of available fonts for configuration UI"""
     return AVAILABLE_FONTS
 
 
+@lru_cache(maxsize=64)
 def get_font(font_name, font_size):
     """
     Get ImageFont object. Prioritizes bundled fonts.
+    Loaded fonts are cached per (font_name, font_size), so the file search
+    and FreeType parse happen once per process instead of on every render.
     """
     font_info = AVAILABLE_FONTS.get(font_name.lower(), AVAILABLE_FONTS['arial'])
     font_files = font_info[1]
     
-    # Check bundled fonts FIRST (and let Pillow fallback search if path fails)
+    # Check bundled fonts FIRST; a cheap isfile() avoids a failed open per miss
     for filename in font_files:
         path = os.path.join(_BUNDLED_FONTS_DIR, filename)
-        try:
-            # removing exists check because Pillow might find it in system paths even if path is wrong
-            return ImageFont.truetype(filename, font_size) 
-        except Exception:
+        if os.path.isfile(path):
             try:
-                # Try full path
                 return ImageFont.truetype(path, font_size)
-            except Exception:
+            except OSError:
                 continue
+    
+    # Then let Pillow search its system font directories by bare filename
+    for filename in font_files:
+        try:
+            return ImageFont.truetype(filename, font_size)
+        except OSError:
+            continue
 
     # Fallback to system fonts explicit paths
     system_paths = [
@@ -89,6 +102,16 @@ def get_font(font_name, font_size):
     return ImageFont.load_default()
 
 
+def prewarm_render_caches():
+    """
+    Load the name font ahead of time, so the first certificate rendered
+    by a fresh worker doesn't also pay for the font search and parse.
+    """
+    if PIL_AVAILABLE:
+        get_font(NAME_FONT, NAME_FONT_SIZE)
+
+
+@lru_cache(maxsize=256)
 def hex_to_rgb(hex_color):
     hex_color = hex_color.lstrip('#')
     try:
@@ -97,62 +120,76 @@ def hex_to_rgb(hex_color):
         return (0, 0, 0)
 
 
+@lru_cache(maxsize=4)
+def _load_template(template_path, mtime_ns):
+    """
+    Decode a template image once per file version. Templates with real
+    transparency are returned as RGBA; fully opaque ones as RGB, so renders
+    can skip the white-background flatten. Keyed on mtime so a replaced
+    file is picked up; callers must copy() the result before drawing on it.
+    """
+    with Image.open(template_path) as template:
+        template = template.convert('RGBA')
+    if template.getchannel('A').getextrema()[0] == 255:
+        template = template.convert('RGB')
+    return template
+
+
 def generate_certificate_png(template_path, participant_name, x_percent, y_percent, 
                              font_size=70, font_color='#000000', font_name='times'):
     # Force Hardcoded values as requested to fix persistent issues
-    font_size = 70
-    font_name = 'times'
+    font_size = NAME_FONT_SIZE
+    font_name = NAME_FONT
 
     if not PIL_AVAILABLE: return None
     
     try:
-        if not os.path.exists(template_path):
+        try:
+            mtime_ns = os.stat(template_path).st_mtime_ns
+        except OSError:
             logging.error(f"Template missing: {template_path}")
             return None
 
-        with Image.open(template_path) as template:
-            if template.mode != 'RGBA':
-                template = template.convert('RGBA')
-            
-            certificate = template.copy()
-            draw = ImageDraw.Draw(certificate)
-            width, height = certificate.size
-            
-            x = (x_percent / 100) * width
-            y = (y_percent / 100) * height
-            
-            font = get_font(font_name, font_size)
-            color = hex_to_rgb(font_color)
-            
-            # Determine text size
-            try:
-                # Newer Pillow
-                bbox = draw.textbbox((0, 0), participant_name, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-            except AttributeError:
-                # Older Pillow fallback
-                text_width, text_height = draw.textsize(participant_name, font=font)
-            
-            text_x = x - (text_width / 2)
-            text_y = y - (text_height / 2)
-            
-            draw.text((text_x, text_y), participant_name, fill=color, font=font)
-            
-            # Convert back to RGB/PNG
-            if certificate.mode == 'RGBA':
-                background = Image.new('RGB', certificate.size, (255, 255, 255))
-                background.paste(certificate, mask=certificate.split()[3])
-                certificate = background
-            
-            output = io.BytesIO()
-            certificate.save(output, format='PNG', quality=95)
-            output.seek(0)
-            return output.getvalue()
+        certificate = _load_template(template_path, mtime_ns).copy()
+        draw = ImageDraw.Draw(certificate)
+        width, height = certificate.size
+        
+        x = (x_percent / 100) * width
+        y = (y_percent / 100) * height
+        
+        font = get_font(font_name, font_size)
+        color = hex_to_rgb(font_color)
+        
+        # Determine text size
+        try:
+            # Newer Pillow
+            bbox = draw.textbbox((0, 0), participant_name, font=font)
+            text_width = bbox[2] - bbox[0]
+            text_height = bbox[3] - bbox[1]
+        except AttributeError:
+            # Older Pillow fallback
+            text_width, text_height = draw.textsize(participant_name, font=font)
+        
+        text_x = x - (text_width / 2)
+        text_y = y - (text_height / 2)
+        
+        draw.text((text_x, text_y), participant_name, fill=color, font=font)
+        
+        # Convert back to RGB/PNG
+        if certificate.mode == 'RGBA':
+            background = Image.new('RGB', certificate.size, (255, 255, 255))
+            background.paste(certificate, mask=certificate.getchannel('A'))
+            certificate = background
+        
+        output = io.BytesIO()
+        # zlib level 3: faster than the default 6 for ~25% larger files, which
+        # are written once to the certificate cache ('quality' is ignored for PNG)
+        certificate.save(output, format='PNG', compress_level=3)
+        output.seek(0)
+        return output.getvalue()
             
     except Exception as e:
         logging.error(f"Certificate generation error: {e}")
-        import traceback
         logging.error(traceback.format_exc())
         return None
 
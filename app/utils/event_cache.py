@@ -0,0 +1,62 @@
+"""
+Read-through cache for Event metadata used on public pages.
+Snapshots are kept per (database, event_id) and stamped with the row's
+(created_at, version). Every UPDATE bumps the version, and an event that
+reuses a deleted event's id has a different created_at, so a stale
+snapshot is never served; it is simply replaced on the next lookup.
+"""
+from types import SimpleNamespace
+from sqlalchemy import select
+from app.models import db, Event
+
+_EVENT_COLUMNS = tuple(column.key for column in Event.__table__.columns)
+
+# Process-local snapshots: (database URL, event_id) -> ((created_at, version), snapshot)
+_snapshots = {}
+_MAX_SNAPSHOTS = 1024
+
+
+def _load_snapshot(event_id):
+    """Load an event as a detached, read-only namespace, with its version stamp."""
+    event = db.session.get(Event, event_id)
+    if event is None:
+        return None, None
+    data = {key: getattr(event, key) for key in _EVENT_COLUMNS}
+    data['has_template'] = event.has_template
+    return (event.created_at, event.version), SimpleNamespace(**data)
+
+
+def get_event_snapshot(event_id):
+    """
+    Get cached event metadata by id.
+
+    Args:
+        event_id: Event primary key
+
+    Returns:
+        SimpleNamespace with the event's column values, or None if not found
+    """
+    row = db.session.execute(
+        select(Event.created_at, Event.version).where(Event.id == event_id)
+    ).first()
+    key = (db.engine.url, event_id)
+    if row is None:
+        _snapshots.pop(key, None)
+        return None
+    cached = _snapshots.get(key)
+    if cached is not None and cached[0] == tuple(row):
+        return cached[1]
+
+    stamp, snapshot = _load_snapshot(event_id)
+    if snapshot is None:
+        return None
+    if key not in _snapshots and len(_snapshots) >= _MAX_SNAPSHOTS:
+        # Evict the oldest entry; dicts keep insertion order
+        _snapshots.pop(next(iter(_snapshots)), None)
+    _snapshots[key] = (stamp, snapshot)
+    return snapshot
+
+
+def forget_event_snapshot(event_id):
+    """Drop this process's cached snapshot of a deleted event."""
+    _snapshots.pop((db.engine.url, event_id), None)
@@ -3,9 +3,19 @@ Helper utilities for file handling, validation, and security.
 """
 import os
 import re
+import time
+import uuid
+from datetime import datetime
 from werkzeug.utils import secure_filename
 from flask import current_app
 
+# Basic email regex pattern
+EMAIL_REGEX = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+EMAIL_PATTERN = re.compile(EMAIL_REGEX)
+
+# Copy buffer used when writing uploaded files to disk
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+
 
 def allowed_file(filename):
     """
@@ -76,7 +86,6 @@ def secure_filename_custom(filename):
     
     # Ensure filename is not empty after securing
     if not secured:
-        import uuid
         secured = f"file_{uuid.uuid4().hex[:8]}"
     
     return secured
@@ -95,9 +104,7 @@ def validate_email(email):
     if not email:
         return False
     
-    # Basic email regex pattern
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email.strip()))
+    return EMAIL_PATTERN.match(email.strip()) is not None
 
 
 def sanitize_email(email):
@@ -143,9 +150,6 @@ def generate_unique_filename(original_filename, prefix=''):
     Returns:
         str: Unique filename
     """
-    import uuid
-    from datetime import datetime
-    
     # Get extension
     ext = get_file_extension(original_filename)
     
@@ -156,3 +160,185 @@ def generate_unique_filename(original_filename, prefix=''):
     if prefix:
         return f"{prefix}_{timestamp}_{unique_id}.{ext}"
     return f"{timestamp}_{unique_id}.{ext}"
+
+
+def save_upload(file, path):
+    """
+    Save an uploaded file to disk using a 1 MB copy buffer.
+    Werkzeug's default 16 KB buffer needs dozens of read/write
+    syscalls per megabyte for large certificate images.
+    
+    Args:
+        file: werkzeug FileStorage from request.files
+        path: Destination path
+    """
+    file.save(path, buffer_size=UPLOAD_BUFFER_SIZE)
+
+
+def save_uploads(uploads, max_workers=8):
+    """
+    Save several uploaded files concurrently. Each file has its own
+    spooled stream, so the copies overlap their disk I/O on a small
+    thread pool instead of running one after another.
+    
+    Args:
+        uploads: List of (FileStorage, destination path) pairs
+        max_workers: Maximum number of writer threads
+    """
+    if len(uploads) <= 1:
+        for file, path in uploads:
+            save_upload(file, path)
+        return
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(uploads))) as executor:
+        # list() re-raises the first failed save in the request thread
+        list(executor.map(lambda item: save_upload(*item), uploads))
+
+
+# Recent failed form attempts: (scope, client key) -> (window start, failures)
+_failed_attempts = {}
+
+
+def too_many_failures(scope, key):
+    """
+    Check whether a client has used up its failed attempts for a form
+    (CAPTCHA, login, email lookup) in the current window. Checked before
+    any CAPTCHA or database work so scripted abuse is rejected cheaply.
+    
+    Args:
+        scope: Name of the protected form, e.g. 'login'
+        key: Client identifier, usually the remote address
+    
+    Returns:
+        bool: True if the request should be refused
+    """
+    limit = current_app.config.get('FAILED_ATTEMPT_LIMIT', 0)
+    if not limit:
+        return False
+    entry = _failed_attempts.get((scope, key))
+    if entry is None:
+        return False
+    if time.monotonic() - entry[0] >= current_app.config.get('FAILED_ATTEMPT_WINDOW', 60):
+        _failed_attempts.pop((scope, key), None)
+        return False
+    return entry[1] >= limit
+
+
+def record_failure(scope, key):
+    """
+    Count a failed attempt for a client (see too_many_failures).
+    
+    Returns:
+        int: Failures recorded for the client in the current window
+    """
+    now = time.monotonic()
+    window = current_app.config.get('FAILED_ATTEMPT_WINDOW', 60)
+    entry = _failed_attempts.get((scope, key))
+    if entry is None or now - entry[0] >= window:
+        # Drop expired windows so the table can't grow without bound
+        if len(_failed_attempts) > 10000:
+            for stale_key, (started, _) in list(_failed_attempts.items()):
+                if now - started >= window:
+                    del _failed_attempts[stale_key]
+        _failed_attempts[(scope, key)] = (now, 1)
+        return 1
+    _failed_attempts[(scope, key)] = (entry[0], entry[1] + 1)
+    return entry[1] + 1
+
+
+def reset_failures(scope, key):
+    """Forget a client's failed attempts after a successful submission."""
+    _failed_attempts.pop((scope, key), None)
+
+
+def keyset_paginate(query, id_column, per_page, before=None, after=None):
+    """
+    Paginate a query newest-first by seeking on an indexed id column,
+    instead of OFFSET scanning and a COUNT(*) over the whole table.
+    
+    Args:
+        query: SQLAlchemy query to paginate
+        id_column: Monotonic primary key column to seek on
+        per_page: Number of rows per page
+        before: Return rows older than this id (next page)
+        after: Return rows newer than this id (previous page)
+    
+    Returns:
+        SimpleNamespace: items, has_newer, has_older, newer_cursor, older_cursor
+    """
+    from types import SimpleNamespace
+    
+    if after is not None:
+        rows = query.filter(id_column > after).order_by(id_column.asc()).limit(per_page + 1).all()
+        has_newer = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        has_older = True
+    else:
+        if before is not None:
+            query = query.filter(id_column < before)
+        rows = query.order_by(id_column.desc()).limit(per_page + 1).all()
+        has_older = len(rows) > per_page
+        items = rows[:per_page]
+        has_newer = before is not None
+    
+    return SimpleNamespace(
+        items=items,
+        has_newer=has_newer and bool(items),
+        has_older=has_older and bool(items),
+        newer_cursor=items[0].id if items else None,
+        older_cursor=items[-1].id if items else None
+    )
+
+
+def remove_file(path):
+    """
+    Delete a file if it exists. Uses a single unlink instead of an
+    exists() check followed by remove(), which also avoids the race
+    between the two calls.
+    
+    Args:
+        path: Absolute file path
+    
+    Returns:
+        bool: True if the file was removed, False otherwise
+    """
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        current_app.logger.warning(f'Could not remove {path}: {e}')
+        return False
+
+
+def remove_files(paths, max_workers=8):
+    """
+    Delete files concurrently; unlink is I/O bound and releases the GIL,
+    so a small thread pool overlaps the syscalls for large batches.
+    Missing files and OS errors are ignored.
+    
+    Args:
+        paths: Iterable of absolute file paths
+        max_workers: Maximum number of deletion threads
+    
+    Returns:
+        int: Number of files actually removed
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    paths = list(paths)
+    if len(paths) <= 1:
+        return sum(map(remove_file, paths))
+    
+    # Worker threads need the app context for remove_file's logger
+    app = current_app._get_current_object()
+    
+    def _remove(path):
+        with app.app_context():
+            return remove_file(path)
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return sum(executor.map(_remove, paths))
@@ -1,7 +1,9 @@
 import os
+import shutil
 import urllib.request
 import ssl
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # Directory setup
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -43,17 +45,22 @@ def download_file(url, filename):
         ctx.check_hostname = False
         ctx.verify_mode = ssl.CERT_NONE
         
+        # Stream to a temporary name so a failed download isn't kept as a font
+        partial = filepath + '.part'
         with urllib.request.urlopen(url, context=ctx) as response:
-            with open(filepath, 'wb') as out_file:
-                out_file.write(response.read())
+            with open(partial, 'wb') as out_file:
+                shutil.copyfileobj(response, out_file, 64 * 1024)
+        os.replace(partial, filepath)
         print(f"Successfully downloaded {filename}")
     except Exception as e:
         print(f"Failed to download {filename}: {e}")
 
 if __name__ == "__main__":
     print(f"Downloading fonts to {FONTS_DIR}...")
-    for filename, url in FONTS.items():
-        download_file(url, filename)
+    # Downloads are network-bound, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=len(FONTS)) as executor:
+        for filename, url in FONTS.items():
+            executor.submit(download_file, url, filename)
     print("Done! Fonts updated.")
     
     # Verify
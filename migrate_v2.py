@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Database Migration Script v2
-Adds Protected Events and Archived Events fields to the Event table.
+Adds Protected Events, Archived Events and change-tracking fields to the Event table,
+plus indexes declared on the models after the tables were first created.
 
 This script safely adds new columns without affecting existing data.
 All new columns have safe defaults so existing events continue to work.
@@ -10,69 +11,101 @@ Run: python migrate_v2.py
 """
 import os
 import sys
-import shutil
+import sqlite3
 from datetime import datetime
 
 # Add the app directory to the path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
-from app import create_app
-from app.models import db
+# Recorded in SQLite's PRAGMA user_version once this script has run;
+# bump it whenever MIGRATIONS or INDEXES change
+SCHEMA_VERSION = 3
 
 # Migration SQL statements (SQLite compatible)
 MIGRATIONS = [
     {
         'name': 'is_protected',
-        'sql': 'ALTER TABLE events ADD COLUMN is_protected BOOLEAN DEFAULT 0',
-        'check': "SELECT name FROM pragma_table_info('events') WHERE name='is_protected'"
+        'sql': 'ALTER TABLE events ADD COLUMN is_protected BOOLEAN DEFAULT 0'
     },
     {
         'name': 'access_token',
-        'sql': 'ALTER TABLE events ADD COLUMN access_token VARCHAR(64)',
-        'check': "SELECT name FROM pragma_table_info('events') WHERE name='access_token'"
+        'sql': 'ALTER TABLE events ADD COLUMN access_token VARCHAR(64)'
     },
     {
         'name': 'is_archived',
-        'sql': 'ALTER TABLE events ADD COLUMN is_archived BOOLEAN DEFAULT 0',
-        'check': "SELECT name FROM pragma_table_info('events') WHERE name='is_archived'"
+        'sql': 'ALTER TABLE events ADD COLUMN is_archived BOOLEAN DEFAULT 0'
     },
     {
         'name': 'show_in_archive',
-        'sql': 'ALTER TABLE events ADD COLUMN show_in_archive BOOLEAN DEFAULT 0',
-        'check': "SELECT name FROM pragma_table_info('events') WHERE name='show_in_archive'"
+        'sql': 'ALTER TABLE events ADD COLUMN show_in_archive BOOLEAN DEFAULT 0'
     },
     {
         'name': 'archived_at',
-        'sql': 'ALTER TABLE events ADD COLUMN archived_at DATETIME',
-        'check': "SELECT name FROM pragma_table_info('events') WHERE name='archived_at'"
+        'sql': 'ALTER TABLE events ADD COLUMN archived_at DATETIME'
     },
+    {
+        'name': 'version',
+        'sql': 'ALTER TABLE events ADD COLUMN version INTEGER NOT NULL DEFAULT 1'
+    },
+]
+
+# Index statements (SQLite compatible, safe to re-run)
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS ix_admin_logs_admin_created ON admin_logs (admin_id, created_at)',
+    'CREATE INDEX IF NOT EXISTS ix_download_logs_participant_downloaded ON download_logs (participant_id, downloaded_at)',
+    'CREATE INDEX IF NOT EXISTS ix_download_logs_downloaded_at ON download_logs (downloaded_at)',
+    'CREATE INDEX IF NOT EXISTS ix_events_visible_archived_created ON events (is_visible, is_archived, created_at)',
 ]
 
 
 def backup_database(db_path):
-    """Create a backup of the database before migration."""
+    """
+    Create a backup of the database before migration.
+    Uses SQLite's online backup API, which includes pages still in the WAL
+    file and gives a consistent snapshot even if the app is writing.
+    """
     if not os.path.exists(db_path):
         print(f"Database file not found at {db_path}")
         return None
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_path = f"{db_path}.backup_{timestamp}"
-    shutil.copy2(db_path, backup_path)
+    source = sqlite3.connect(db_path)
+    try:
+        target = sqlite3.connect(backup_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+    finally:
+        source.close()
     print(f"✓ Database backed up to: {backup_path}")
     return backup_path
 
 
-def column_exists(cursor, column_name):
-    """Check if a column already exists in the events table."""
-    cursor.execute(f"SELECT name FROM pragma_table_info('events') WHERE name='{column_name}'")
-    return cursor.fetchone() is not None
+def existing_columns(cursor):
+    """Return the set of column names currently on the events table."""
+    cursor.execute("PRAGMA table_info(events)")
+    return {row[1] for row in cursor.fetchall()}
 
 
-def run_migrations():
+def run_migrations(app):
     """Run all pending migrations."""
-    app = create_app()
+    from app.models import db
     
     with app.app_context():
+        is_sqlite = db.engine.url.get_backend_name() == 'sqlite'
+        
+        # Databases already stamped with this version need no backup or probes
+        if is_sqlite:
+            with db.engine.connect() as conn:
+                version = conn.exec_driver_sql('PRAGMA user_version').scalar()
+            if version >= SCHEMA_VERSION:
+                print(f"✓ Database is already at schema version {version}, nothing to do")
+                return True
+        
         # Get database path from URI
         db_uri = app.config['SQLALCHEMY_DATABASE_URI']
         
@@ -96,8 +129,14 @@ def run_migrations():
             migrations_run = 0
             migrations_skipped = 0
             
+            # SQLite runs DDL in autocommit mode (one sync per ALTER); take the
+            # write lock once and apply every change in a single transaction
+            if is_sqlite:
+                cursor.execute('BEGIN IMMEDIATE')
+            
+            columns = existing_columns(cursor)
             for migration in MIGRATIONS:
-                if column_exists(cursor, migration['name']):
+                if migration['name'] in columns:
                     print(f"⊙ Column '{migration['name']}' already exists, skipping")
                     migrations_skipped += 1
                 else:
@@ -106,6 +145,13 @@ def run_migrations():
                     migrations_run += 1
                     print(f"✓ Column '{migration['name']}' added successfully")
             
+            for statement in INDEXES:
+                cursor.execute(statement)
+            print(f"✓ Ensured {len(INDEXES)} index(es)")
+            
+            if is_sqlite:
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            
             connection.commit()
             
             print("\n" + "=" * 50)
@@ -132,9 +178,9 @@ def run_migrations():
             connection.close()
 
 
-def verify_migration():
+def verify_migration(app):
     """Verify that all columns were added correctly."""
-    app = create_app()
+    from app.models import db
     
     with app.app_context():
         connection = db.engine.raw_connection()
@@ -143,8 +189,9 @@ def verify_migration():
         print("\nVerifying migration...")
         all_ok = True
         
+        columns = existing_columns(cursor)
         for migration in MIGRATIONS:
-            if column_exists(cursor, migration['name']):
+            if migration['name'] in columns:
                 print(f"  ✓ {migration['name']}")
             else:
                 print(f"  ✗ {migration['name']} - MISSING!")
@@ -168,9 +215,11 @@ if __name__ == '__main__':
     print("=" * 50)
     print()
     
-    success = run_migrations()
+    from app import create_app
+    app = create_app()
+    success = run_migrations(app)
     
     if success:
-        verify_migration()
+        verify_migration(app)
     
     sys.exit(0 if success else 1)
@@ -5,8 +5,10 @@ Simple and compatible with Python 3.7+
 import sys
 import os
 
-# Add project to path
-sys.path.insert(0, os.path.dirname(__file__))
+# Add project to path (Passenger usually has it there already)
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 # Set production mode
 os.environ['FLASK_ENV'] = 'production'
@@ -12,22 +12,21 @@ from datetime import date
 
 # Add project root to path
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, PROJECT_ROOT)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Directories the app expects under the project root
+SEED_DIRECTORIES = tuple(os.path.join(PROJECT_ROOT, name)
+                         for name in ('instance', 'certificates', 'uploads'))
 
 
 def create_directories():
     """Create required directories if they don't exist."""
-    directories = [
-        os.path.join(PROJECT_ROOT, 'instance'),
-        os.path.join(PROJECT_ROOT, 'certificates'),
-        os.path.join(PROJECT_ROOT, 'uploads'),
-    ]
-    
-    for directory in directories:
-        if not os.path.exists(directory):
+    for directory in SEED_DIRECTORIES:
+        try:
             os.makedirs(directory)
             print(f"✓ Created directory: {directory}")
-        else:
+        except FileExistsError:
             print(f"✓ Directory exists: {directory}")
 
 
@@ -50,8 +49,9 @@ def seed_database():
     app = create_app()
     
     with app.app_context():
-        # Create all tables
-        db.create_all()
+        # Create all tables, unless create_app already did
+        if not app.config.get('AUTO_CREATE_SCHEMA', True):
+            db.create_all()
         print("✓ SQLite database created")
         print(f"  Location: {app.config['SQLALCHEMY_DATABASE_URI']}")
         print()
@@ -59,16 +59,15 @@ def seed_database():
         print("[3/3] Seeding data...")
         
         # Check if admin already exists
-        existing_admin = Admin.query.filter_by(username='admin').first()
+        admin_exists = db.session.query(Admin.id).filter_by(username='admin').first() is not None
         
-        if existing_admin:
+        if admin_exists:
             print("✓ Admin user already exists")
         else:
             # Create default admin user (super admin)
             admin = Admin(username='admin', is_super_admin=True)
             admin.set_password('admin123')
             db.session.add(admin)
-            db.session.commit()
             print("✓ Default super admin user created")
             print("  ┌─────────────────────────────────┐")
             print("  │  Username: admin                │")
@@ -76,7 +75,7 @@ def seed_database():
             print("  └─────────────────────────────────┘")
         
         # Create a sample event (optional)
-        if Event.query.count() == 0:
+        if not db.session.query(Event.query.exists()).scalar():
             sample_event = Event(
                 name='Sample Tech Workshop 2024',
                 description='This is a sample event demonstrating the certificate portal. You can edit or delete it from the admin panel.',
@@ -84,9 +83,11 @@ def seed_database():
                 is_visible=True
             )
             db.session.add(sample_event)
-            db.session.commit()
             print("✓ Sample event created")
         
+        # Admin and sample event are written in one transaction
+        db.session.commit()
+        
         print()
         print("=" * 50)
         print("✓ Setup Complete!")
@@ -0,0 +1,77 @@
+"""
+Shared fixtures: every test gets its own app with a temporary SQLite
+database and temporary upload/certificate folders.
+"""
+import os
+import pytest
+from PIL import Image
+from app import create_app
+from app.models import db, Admin, Event, Participant
+from app.utils import helpers
+
+
+def make_app(root):
+    """Create a testing app whose database and folders all live under root."""
+    uploads = root / 'uploads'
+    certificates = root / 'certificates'
+    return create_app('testing', {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{root / "test.db"}',
+        'INSTANCE_DIR': str(root / 'instance'),
+        'UPLOAD_FOLDER': str(uploads),
+        'TEMPLATES_FOLDER': str(uploads / 'templates'),
+        'CERTIFICATES_FOLDER': str(certificates),
+        'GENERATED_FOLDER': str(certificates / 'generated'),
+    })
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    helpers._failed_attempts.clear()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+    helpers._failed_attempts.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(app, client):
+    """Test client logged in as a super admin."""
+    admin = Admin(username='root', is_super_admin=True)
+    admin.set_password('secret-pw')
+    db.session.add(admin)
+    db.session.commit()
+    with client.session_transaction() as session:
+        session.update(admin_logged_in=True, admin_id=admin.id,
+                       admin_username='root', is_super_admin=True)
+    return client
+
+
+@pytest.fixture
+def template_event(app):
+    """Visible event with a small PNG template and one participant."""
+    template_name = 'template.png'
+    Image.new('RGB', (300, 200), 'white').save(
+        os.path.join(app.config['TEMPLATES_FOLDER'], template_name))
+    event = Event(name='Workshop', is_visible=True, template_filename=template_name,
+                  name_position_x=50, name_position_y=50)
+    db.session.add(event)
+    db.session.commit()
+    participant = Participant(event_id=event.id, name='Ada Lovelace', email='ada@example.com')
+    db.session.add(participant)
+    db.session.commit()
+    return event, participant
+
+
+def solve_captcha(html):
+    """Answer the math CAPTCHA rendered into a form page."""
+    import re
+    match = re.search(r'(\d+) (\+|-|×) (\d+) = \?', html)
+    a, op, b = int(match.group(1)), match.group(2), int(match.group(3))
+    return str(a + b if op == '+' else a - b if op == '-' else a * b)
@@ -0,0 +1,88 @@
+"""Tests for reading and validating bulk participant uploads."""
+import io
+import pytest
+from app.models import db, Participant
+from app.routes.admin import _read_bulk_file, _validate_bulk_rows
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_csv_keeps_name_and_email_columns(tmp_path):
+    path = _write(tmp_path, 'people.csv',
+                  b'id,name,email,notes\n1,Ada,ada@example.com,x\n\n2,Grace,grace@example.com\n')
+    assert _read_bulk_file(path) == {
+        'name': ['Ada', 'Grace'],
+        'email': ['ada@example.com', 'grace@example.com'],
+    }
+
+
+def test_csv_handles_excel_bom_and_short_rows(tmp_path):
+    path = _write(tmp_path, 'people.csv',
+                  '\ufeffname,email\nAda Lovelace,ada@example.com\nGrace\n'.encode('utf-8'))
+    assert _read_bulk_file(path) == {
+        'name': ['Ada Lovelace', 'Grace'],
+        'email': ['ada@example.com', ''],
+    }
+
+
+def test_csv_reports_missing_columns(tmp_path):
+    path = _write(tmp_path, 'people.csv', b'full_name,email\nAda,ada@example.com\n')
+    assert set(_read_bulk_file(path)) == {'email'}
+
+
+def test_xlsx_reads_cells_as_text(tmp_path):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    path = str(tmp_path / 'people.xlsx')
+    pd.DataFrame({
+        'name': ['Ada', None, 'Grace'],
+        'email': ['ada@example.com', 'nobody@example.com', '12345'],
+        'extra': [1, 2, 3],
+    }).to_excel(path, index=False)
+
+    assert _read_bulk_file(path) == {
+        'name': ['Ada', '', 'Grace'],
+        'email': ['ada@example.com', 'nobody@example.com', '12345'],
+    }
+
+
+def test_validation_flags_each_problem(app, template_event):
+    event, _ = template_event  # ada@example.com is already registered
+    sheet = {
+        'name': [' Grace ', '', 'Ada', 'Linus', 'Grace Again', 'Bad'],
+        'email': ['GRACE@example.com', 'x@example.com', 'ada@example.com', '',
+                  'grace@example.com', 'not-an-email'],
+    }
+    rows = _validate_bulk_rows(sheet, event.id)
+
+    assert [row['row'] for row in rows] == [1, 2, 3, 4, 5, 6]
+    assert rows[0]['name'] == 'Grace' and rows[0]['email'] == 'grace@example.com'
+    assert [row['errors'] for row in rows] == [
+        None,
+        'Missing name',
+        'Duplicate email',
+        'Missing email',
+        'Duplicate email',
+        'Invalid email',
+    ]
+    assert [row['valid'] for row in rows] == [True, False, False, False, False, False]
+
+
+def test_bulk_upload_route_imports_valid_rows(app, admin_client, template_event):
+    event, _ = template_event
+    csv_data = b'name,email\nGrace,grace@example.com\nNo Email,\nLinus,linus@example.com\n'
+
+    response = admin_client.post(f'/admin/events/{event.id}/bulk-upload',
+                                 data={'file': (io.BytesIO(csv_data), 'people.csv')},
+                                 content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert b'grace@example.com' in response.data
+
+    assert admin_client.post('/admin/bulk-upload/confirm').status_code == 302
+    emails = {email for (email,) in
+              db.session.query(Participant.email).filter_by(event_id=event.id)}
+    assert emails == {'ada@example.com', 'grace@example.com', 'linus@example.com'}
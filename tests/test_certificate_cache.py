@@ -0,0 +1,90 @@
+"""Tests for the on-disk cache of template-generated certificates."""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.models import db, Participant
+from app.utils import certificate_cache
+from app.utils.certificate_cache import (get_certificate_path, clear_certificate_cache,
+                                         clear_participant_certificates)
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    """Count real renders, slowed slightly so concurrent callers overlap."""
+    calls = []
+    real_render = certificate_cache.generate_certificate_png
+
+    def counting_render(*args, **kwargs):
+        calls.append(kwargs['participant_name'])
+        time.sleep(0.05)
+        return real_render(*args, **kwargs)
+
+    monkeypatch.setattr(certificate_cache, 'generate_certificate_png', counting_render)
+    return calls
+
+
+def test_renders_once_then_serves_file(app, template_event, render_calls):
+    event, participant = template_event
+
+    path = get_certificate_path(event, participant.id, participant.name)
+    assert path and os.path.isfile(path)
+    with open(path, 'rb') as f:
+        assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+    assert get_certificate_path(event, participant.id, participant.name) == path
+    assert render_calls == ['Ada Lovelace']
+
+
+def test_changed_inputs_use_a_new_file(app, template_event, render_calls):
+    event, participant = template_event
+    original = get_certificate_path(event, participant.id, participant.name)
+
+    renamed = get_certificate_path(event, participant.id, 'Ada King')
+    event.font_size = 48
+    db.session.commit()
+    resized = get_certificate_path(event, participant.id, 'Ada King')
+
+    assert len({original, renamed, resized}) == 3
+    assert len(render_calls) == 3
+
+
+def test_concurrent_requests_render_once(app, template_event, render_calls):
+    event, participant = template_event
+    start = threading.Barrier(6)
+
+    def fetch():
+        with app.app_context():
+            start.wait()
+            return get_certificate_path(event, participant.id, participant.name)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        paths = list(executor.map(lambda _: fetch(), range(6)))
+
+    assert len(set(paths)) == 1 and os.path.isfile(paths[0])
+    assert render_calls == ['Ada Lovelace']
+    assert not certificate_cache._render_locks
+    cache_dir = os.path.dirname(paths[0])
+    assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]
+
+
+def test_clear_participant_certificates_matches_exact_ids(app, template_event, render_calls):
+    event, first = template_event
+    participants = [first] + [
+        Participant(event_id=event.id, name=f'Person {i}', email=f'p{i}@example.com')
+        for i in range(11)
+    ]
+    db.session.add_all(participants)
+    db.session.commit()
+    paths = {p.id: get_certificate_path(event, p.id, p.name) for p in participants}
+    # '1_' must not match the files of participants 11 and 12
+    assert first.id == 1 and {11, 12} <= set(paths)
+
+    clear_participant_certificates(event.id, [first.id])
+
+    assert not os.path.exists(paths[first.id])
+    assert all(os.path.exists(path) for pid, path in paths.items() if pid != first.id)
+
+    clear_certificate_cache(event.id)
+    assert not any(os.path.exists(path) for path in paths.values())
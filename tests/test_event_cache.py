@@ -0,0 +1,69 @@
+"""Tests for the public-page event snapshot cache."""
+from app.models import db, Event
+from app.utils.event_cache import get_event_snapshot, forget_event_snapshot
+from tests.conftest import make_app
+
+
+def _add_event(**fields):
+    event = Event(**fields)
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def test_snapshot_is_reused_until_the_event_changes(app):
+    event = _add_event(name='Original', is_visible=True)
+
+    first = get_event_snapshot(event.id)
+    assert first.name == 'Original'
+    assert get_event_snapshot(event.id) is first
+
+    event.name = 'Renamed'
+    db.session.commit()
+    assert event.version == 2
+    assert get_event_snapshot(event.id).name == 'Renamed'
+
+
+def test_missing_event_returns_none(app):
+    assert get_event_snapshot(12345) is None
+
+
+def test_reused_id_does_not_serve_deleted_event(app, client):
+    protected = _add_event(name='Secret', is_visible=True, is_protected=True)
+    protected.generate_access_token()
+    db.session.commit()
+    event_id = protected.id
+    assert client.get(f'/event/{event_id}').status_code == 404
+
+    # Deleted without forgetting the snapshot, as another worker would
+    db.session.delete(protected)
+    db.session.commit()
+    replacement = _add_event(name='Public', is_visible=True)
+    assert replacement.id == event_id and replacement.version == 1
+
+    response = client.get(f'/event/{event_id}')
+    assert response.status_code == 200
+    assert b'Public' in response.data
+    snapshot = get_event_snapshot(event_id)
+    assert not snapshot.is_protected and snapshot.access_token is None
+
+
+def test_forget_drops_snapshot(app):
+    event = _add_event(name='Gone soon', is_visible=True)
+    first = get_event_snapshot(event.id)
+    forget_event_snapshot(event.id)
+    second = get_event_snapshot(event.id)
+    assert second is not first and second.name == 'Gone soon'
+
+
+def test_apps_on_different_databases_do_not_share_snapshots(app, tmp_path):
+    _add_event(name='First database', is_visible=True)
+    assert get_event_snapshot(1).name == 'First database'
+
+    other = make_app(tmp_path / 'other')
+    with other.app_context():
+        _add_event(name='Second database', is_visible=True)
+        assert get_event_snapshot(1).name == 'Second database'
+        db.engine.dispose()
+
+    assert get_event_snapshot(1).name == 'First database'
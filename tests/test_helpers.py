@@ -0,0 +1,121 @@
+"""Tests for keyset pagination and the failed-attempt limiter."""
+import pytest
+from app.models import db, Event
+from app.utils import helpers
+from app.utils.helpers import keyset_paginate, too_many_failures, record_failure, reset_failures
+from tests.conftest import solve_captcha
+
+
+@pytest.fixture
+def events(app):
+    db.session.add_all(Event(name=f'Event {i}') for i in range(1, 26))
+    db.session.commit()
+    return list(range(1, 26))
+
+
+def _ids(page):
+    return [event.id for event in page.items]
+
+
+def test_keyset_paginate_walks_newest_first(app, events):
+    first = keyset_paginate(Event.query, Event.id, 10)
+    assert _ids(first) == list(range(25, 15, -1))
+    assert first.has_older and not first.has_newer
+    assert (first.newer_cursor, first.older_cursor) == (25, 16)
+
+    second = keyset_paginate(Event.query, Event.id, 10, before=first.older_cursor)
+    assert _ids(second) == list(range(15, 5, -1))
+    assert second.has_older and second.has_newer
+
+    last = keyset_paginate(Event.query, Event.id, 10, before=second.older_cursor)
+    assert _ids(last) == [5, 4, 3, 2, 1]
+    assert not last.has_older and last.has_newer
+
+
+def test_keyset_paginate_steps_back_with_after(app, events):
+    back = keyset_paginate(Event.query, Event.id, 10, after=15)
+    assert _ids(back) == list(range(25, 15, -1))
+    assert back.has_older and not back.has_newer
+
+    middle = keyset_paginate(Event.query, Event.id, 10, after=5)
+    assert _ids(middle) == list(range(15, 5, -1))
+    assert middle.has_newer and middle.has_older
+
+
+def test_keyset_paginate_respects_filters_and_empty_pages(app, events):
+    odd = Event.query.filter(Event.id % 2 == 1)
+    page = keyset_paginate(odd, Event.id, 3, before=10)
+    assert _ids(page) == [9, 7, 5]
+
+    empty = keyset_paginate(Event.query, Event.id, 10, before=1)
+    assert empty.items == []
+    assert not empty.has_newer and not empty.has_older
+    assert empty.newer_cursor is None and empty.older_cursor is None
+
+
+def test_failures_block_at_limit_and_reset(app):
+    app.config.update(FAILED_ATTEMPT_LIMIT=3, FAILED_ATTEMPT_WINDOW=60)
+
+    assert [record_failure('login', '10.0.0.1') for _ in range(2)] == [1, 2]
+    assert not too_many_failures('login', '10.0.0.1')
+    assert record_failure('login', '10.0.0.1') == 3
+    assert too_many_failures('login', '10.0.0.1')
+
+    # Scopes and addresses are counted separately
+    assert not too_many_failures('download', '10.0.0.1')
+    assert not too_many_failures('login', '10.0.0.2')
+
+    reset_failures('login', '10.0.0.1')
+    assert not too_many_failures('login', '10.0.0.1')
+
+
+def test_failure_window_expires(app, monkeypatch):
+    app.config.update(FAILED_ATTEMPT_LIMIT=2, FAILED_ATTEMPT_WINDOW=60)
+    now = [1000.0]
+    monkeypatch.setattr(helpers.time, 'monotonic', lambda: now[0])
+
+    record_failure('login', 'client')
+    record_failure('login', 'client')
+    assert too_many_failures('login', 'client')
+
+    now[0] += 61
+    assert not too_many_failures('login', 'client')
+    assert record_failure('login', 'client') == 1
+
+
+def test_limit_zero_disables_blocking(app):
+    app.config.update(FAILED_ATTEMPT_LIMIT=0)
+    for _ in range(50):
+        record_failure('login', 'client')
+    assert not too_many_failures('login', 'client')
+
+
+def _post_login(client, password):
+    answer = solve_captcha(client.get('/admin/login').get_data(as_text=True))
+    return client.post('/admin/login', data={'username': 'nobody', 'password': password,
+                                             'captcha': answer})
+
+
+def test_login_route_returns_429_after_limit(app, client):
+    app.config.update(FAILED_ATTEMPT_LIMIT=3, FAILED_ATTEMPT_WINDOW=60)
+    codes = [_post_login(client, 'wrong').status_code for _ in range(4)]
+    assert codes == [200, 200, 200, 429]
+
+
+def test_unknown_download_emails_are_not_counted(app, client, template_event):
+    app.config.update(FAILED_ATTEMPT_LIMIT=2, FAILED_ATTEMPT_WINDOW=60)
+    event, _ = template_event
+    for i in range(5):
+        answer = solve_captcha(client.get(f'/event/{event.id}').get_data(as_text=True))
+        response = client.post(f'/event/{event.id}',
+                                data={'email': f'typo{i}@example.com', 'captcha': answer})
+        assert response.status_code == 200
+        assert b'No certificate found' in response.data
+
+    # Wrong CAPTCHA answers still count
+    for _ in range(2):
+        client.get(f'/event/{event.id}')
+        client.post(f'/event/{event.id}', data={'email': 'ada@example.com', 'captcha': 'x'})
+    client.get(f'/event/{event.id}')
+    response = client.post(f'/event/{event.id}', data={'email': 'ada@example.com', 'captcha': 'x'})
+    assert response.status_code == 429
@@ -0,0 +1,55 @@
+"""Tests for model column types."""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql, postgresql
+from app.models import db, AdminLog, DownloadLog, Participant, PackedIPAddress
+
+
+@pytest.mark.parametrize('value, storage', [
+    ('192.168.1.20', 'blob'),
+    ('10.0.0.1', 'blob'),
+    ('::1', 'blob'),
+    ('2001:db8::8a2e:370:7334', 'blob'),
+    # Not IP addresses; 4 and 16 characters must not be read back as packed
+    ('abcd', 'text'),
+    ('unknown-host-xyz', 'text'),
+    ('not an address', 'text'),
+    (None, 'null'),
+])
+def test_ip_address_round_trips(app, value, storage):
+    db.session.add(AdminLog(action='test', ip_address=value))
+    db.session.commit()
+    db.session.expire_all()
+
+    assert AdminLog.query.one().ip_address == value
+    stored = db.session.execute(text('SELECT typeof(ip_address) FROM admin_logs')).scalar()
+    assert stored == storage
+
+
+def test_ipv4_is_stored_in_four_bytes(app):
+    db.session.add(AdminLog(action='test', ip_address='203.0.113.7'))
+    db.session.commit()
+    raw = db.session.execute(text('SELECT ip_address FROM admin_logs')).scalar()
+    assert raw == bytes([203, 0, 113, 7])
+
+
+def test_legacy_text_rows_read_unchanged(app):
+    db.session.execute(text(
+        "INSERT INTO admin_logs (action, ip_address) VALUES ('legacy', '198.51.100.4')"))
+    db.session.commit()
+    assert AdminLog.query.one().ip_address == '198.51.100.4'
+
+
+def test_download_log_uses_packed_addresses(app, template_event):
+    _, participant = template_event
+    Participant.increment_download(participant.id, ip_address='2001:db8::1')
+    db.session.commit()
+    assert DownloadLog.query.one().ip_address == '2001:db8::1'
+
+
+@pytest.mark.parametrize('dialect', [postgresql.dialect(), mysql.dialect()])
+def test_server_databases_keep_plain_strings(dialect):
+    column_type = PackedIPAddress()
+    assert column_type.process_bind_param('192.168.1.20', dialect) == '192.168.1.20'
+    assert column_type.process_result_value('192.168.1.20', dialect) == '192.168.1.20'
+    assert str(column_type.dialect_impl(dialect).impl.compile(dialect=dialect)) == 'VARCHAR(50)'